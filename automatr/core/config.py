@@ -4,12 +4,124 @@ Handles loading/saving app configuration from a single JSON file.
 """
 
 import json
+import mmap
+import os
 import platform
-from dataclasses import dataclass, field, asdict
+import threading
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import IO, Any, Optional, Sequence
 
+try:
+    import orjson  # Optional: faster JSON serialization
+except ImportError:
+    orjson = None
 
+
+# Files at least this large are memory-mapped by read_json
+_MMAP_THRESHOLD = 16 * 1024
+
+# Directories already created this session; lets save paths skip mkdir
+_ENSURED: set[Path] = set()
+
+
+def ensure_dir(directory: Path) -> None:
+    """Create a directory (and parents) once per process."""
+    if directory not in _ENSURED:
+        directory.mkdir(parents=True, exist_ok=True)
+        _ENSURED.add(directory)
+
+
+def forget_dir(directory: Path) -> None:
+    """Drop a removed directory from the once-per-process mkdir cache.
+    
+    Call after deleting a directory so the next ensure_dir() recreates it.
+    """
+    _ENSURED.discard(directory)
+
+
+def ensure_parent(path: Path) -> None:
+    """Create the parent directory of a file path once per process."""
+    ensure_dir(path.parent)
+
+
+def open_for_write(path: Path, mode: str = "w") -> IO:
+    """Open a file for writing, creating its parent directory if needed.
+    
+    If the directory was removed outside the app after ensure_dir()
+    recorded it, it is created again and the open retried.
+    
+    Args:
+        path: File to open.
+        mode: A write or append mode; text modes use UTF-8.
+        
+    Raises:
+        OSError: If the file cannot be opened.
+    """
+    encoding = None if "b" in mode else "utf-8"
+    ensure_parent(path)
+    try:
+        return open(path, mode, encoding=encoding)
+    except FileNotFoundError:
+        forget_dir(path.parent)
+        ensure_parent(path)
+        return open(path, mode, encoding=encoding)
+
+
+def loads_json(raw: bytes) -> Any:
+    """Parse JSON from raw UTF-8 bytes, via orjson when available.
+    
+    Raises:
+        json.JSONDecodeError: If the data is not valid JSON.
+    """
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def read_json(path: Path) -> Any:
+    """Read and parse a JSON file, via orjson when available.
+    
+    With orjson, files of _MMAP_THRESHOLD bytes or more are memory-mapped
+    rather than copied into a bytes object first.
+    
+    Raises:
+        OSError: If the file cannot be read.
+        json.JSONDecodeError: If the file is not valid JSON.
+    """
+    if orjson is not None:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < _MMAP_THRESHOLD:
+                return orjson.loads(f.read())
+            # Large file: let orjson parse straight from the page cache
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    return orjson.loads(view)
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_json_atomic(path: Path, data: Any) -> None:
+    """Write data as indented JSON, atomically replacing the file.
+    
+    Writes to a sibling temp file and renames it over the target, so a
+    crash mid-write never leaves a truncated file behind.
+    
+    Raises:
+        OSError: If the file cannot be written.
+    """
+    tmp_path = path.with_name(path.name + ".tmp")
+    if orjson is not None:
+        with open_for_write(tmp_path, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open_for_write(tmp_path) as f:
+            json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+@lru_cache(maxsize=None)
 def get_platform() -> str:
     """Get the current platform.
     
@@ -35,47 +147,46 @@ def get_platform() -> str:
     return "unknown"
 
 
+@lru_cache(maxsize=None)
 def is_windows() -> bool:
     """Check if running on native Windows."""
     return get_platform() == "windows"
 
 
+@lru_cache(maxsize=None)
 def get_config_dir() -> Path:
     """Get the configuration directory path.
     
     On macOS: ~/Library/Application Support/automatr
     On Linux/WSL: XDG_CONFIG_HOME or ~/.config/automatr
+    
+    Cached for the process lifetime, so the directory is created once.
     """
-    import os
-
-    system = platform.system()
-    if system == "Darwin":
-        base = Path.home() / "Library" / "Application Support"
+    if get_platform() == "macos":
+        base = os.path.expanduser("~/Library/Application Support")
     else:
-        xdg_config = os.environ.get("XDG_CONFIG_HOME")
-        if xdg_config:
-            base = Path(xdg_config)
-        else:
-            base = Path.home() / ".config"
+        base = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
     
-    config_dir = base / "automatr"
-    config_dir.mkdir(parents=True, exist_ok=True)
+    config_dir = Path(os.path.join(base, "automatr"))
+    ensure_dir(config_dir)
     return config_dir
 
 
+@lru_cache(maxsize=None)
 def get_config_path() -> Path:
     """Get the configuration file path."""
     return get_config_dir() / "config.json"
 
 
+@lru_cache(maxsize=None)
 def get_templates_dir() -> Path:
     """Get the templates directory path."""
     templates_dir = get_config_dir() / "templates"
-    templates_dir.mkdir(parents=True, exist_ok=True)
+    ensure_dir(templates_dir)
     return templates_dir
 
 
-@dataclass
+@dataclass(slots=True)
 class LLMConfig:
     """Configuration for the local LLM server."""
     
@@ -94,7 +205,7 @@ class LLMConfig:
     repeat_penalty: float = 1.1
 
 
-@dataclass
+@dataclass(slots=True)
 class UIConfig:
     """Configuration for the UI."""
     
@@ -110,18 +221,19 @@ class UIConfig:
     window_geometry: str = ""  # Base64 encoded QByteArray
     
     # Layout persistence
-    splitter_sizes: list = field(default_factory=lambda: [200, 300, 400])
+    # Immutable defaults; the UI always assigns a fresh list rather than mutating
+    splitter_sizes: Sequence[int] = (200, 300, 400)
     
     # Selection persistence
     last_template: str = ""
-    expanded_folders: list = field(default_factory=list)
+    expanded_folders: Sequence[str] = ()
     last_editor_folder: str = ""
     
     # Template versioning
     max_template_versions: int = 10  # Max versions to keep per template (original always preserved)
 
 
-@dataclass
+@dataclass(slots=True)
 class EspansoConfig:
     """Configuration for Espanso integration."""
     
@@ -130,7 +242,18 @@ class EspansoConfig:
     auto_sync: bool = True  # Auto-sync on template save/delete
 
 
-@dataclass
+# Known field names per section; unknown keys in config.json are ignored
+_LLM_FIELDS = frozenset(f.name for f in fields(LLMConfig))
+_UI_FIELDS = frozenset(f.name for f in fields(UIConfig))
+_ESPANSO_FIELDS = frozenset(f.name for f in fields(EspansoConfig))
+
+
+def _section_to_dict(section: Any) -> dict:
+    """Shallow-copy a config section's fields into a dict, in field order."""
+    return {f.name: getattr(section, f.name) for f in fields(section)}
+
+
+@dataclass(slots=True)
 class Config:
     """Main application configuration."""
     
@@ -140,22 +263,43 @@ class Config:
     
     def to_dict(self) -> dict:
         """Convert config to dictionary."""
-        return asdict(self)
+        return {
+            "llm": _section_to_dict(self.llm),
+            "ui": _section_to_dict(self.ui),
+            "espanso": _section_to_dict(self.espanso),
+        }
     
     @classmethod
     def from_dict(cls, data: dict) -> "Config":
-        """Create config from dictionary."""
-        llm_data = data.get("llm", {})
-        ui_data = data.get("ui", {})
-        espanso_data = data.get("espanso", {})
+        """Create config from dictionary.
+        
+        Keys that are not fields of the matching section (e.g. settings
+        removed in a newer version) are dropped instead of raising.
+        """
+        llm_data = data.get("llm") or {}
+        ui_data = data.get("ui") or {}
+        espanso_data = data.get("espanso") or {}
         
         return cls(
-            llm=LLMConfig(**llm_data) if llm_data else LLMConfig(),
-            ui=UIConfig(**ui_data) if ui_data else UIConfig(),
-            espanso=EspansoConfig(**espanso_data) if espanso_data else EspansoConfig(),
+            llm=LLMConfig(**{k: v for k, v in llm_data.items() if k in _LLM_FIELDS}),
+            ui=UIConfig(**{k: v for k, v in ui_data.items() if k in _UI_FIELDS}),
+            espanso=EspansoConfig(
+                **{k: v for k, v in espanso_data.items() if k in _ESPANSO_FIELDS}
+            ),
         )
 
 
+# Valid update() keys mapped to (section, attribute); section "" = top-level
+_UPDATE_KEYS: dict[str, tuple[str, str]] = {
+    **{section.name: ("", section.name) for section in fields(Config)},
+    **{
+        f"{section.name}.{attr.name}": (section.name, attr.name)
+        for section in fields(Config)
+        for attr in fields(section.default_factory)
+    },
+}
+
+
 class ConfigManager:
     """Manages loading and saving application configuration."""
     
@@ -167,13 +311,22 @@ class ConfigManager:
         """
         self.config_path = config_path or get_config_path()
         self._config: Optional[Config] = None
+        self._load_lock = threading.Lock()
     
     @property
     def config(self) -> Config:
-        """Get the current configuration, loading if necessary."""
-        if self._config is None:
-            self._config = self.load()
-        return self._config
+        """Get the current configuration, loading if necessary.
+        
+        The first access loads under a lock so concurrent callers (e.g. the
+        GUI thread and a background sync) share a single parse.
+        """
+        config = self._config
+        if config is None:
+            with self._load_lock:
+                if self._config is None:
+                    self._config = self.load()
+                config = self._config
+        return config
     
     def load(self) -> Config:
         """Load configuration from file.
@@ -188,8 +341,9 @@ class ConfigManager:
             with open(self.config_path, "r", encoding="utf-8") as f:
                 data = json.load(f)
             return Config.from_dict(data)
-        except (json.JSONDecodeError, KeyError, TypeError) as e:
-            # Log error and return defaults
+        except (json.JSONDecodeError, KeyError, TypeError, AttributeError) as e:
+            # Log error and return defaults (AttributeError: a section that
+            # is not a JSON object)
             print(f"Warning: Failed to load config: {e}")
             return Config()
     
@@ -206,9 +360,7 @@ class ConfigManager:
             config = self.config
         
         try:
-            self.config_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.config_path, "w", encoding="utf-8") as f:
-                json.dump(config.to_dict(), f, indent=2)
+            write_json_atomic(self.config_path, config.to_dict())
             self._config = config
             return True
         except OSError as e:
@@ -229,16 +381,14 @@ class ConfigManager:
         config = self.config
         
         for key, value in kwargs.items():
-            parts = key.split(".")
-            if len(parts) == 2:
-                section, attr = parts
-                if hasattr(config, section):
-                    section_obj = getattr(config, section)
-                    if hasattr(section_obj, attr):
-                        setattr(section_obj, attr, value)
-            elif len(parts) == 1:
-                if hasattr(config, key):
-                    setattr(config, key, value)
+            target = _UPDATE_KEYS.get(key)
+            if target is None:
+                continue
+            section, attr = target
+            if section:
+                setattr(getattr(config, section), attr, value)
+            else:
+                setattr(config, attr, value)
         
         return self.save(config)
 
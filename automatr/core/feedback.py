@@ -6,22 +6,36 @@ to enable future template improvements.
 
 import hashlib
 import json
-from dataclasses import dataclass, field, asdict
+import os
+import re
+from dataclasses import dataclass
 from datetime import datetime
-from pathlib import Path
-from typing import List, Optional, Literal
+from typing import Dict, List, Optional, Literal
 
-from automatr.core.config import get_config_dir
+from automatr.core.config import get_config_dir, open_for_write
+from automatr.core.templates import load_meta_template
 
+# {{name}} placeholders in meta-templates
+_PLACEHOLDER_RE = re.compile(r"\{\{(\w+)\}\}")
 
-@dataclass
+
+def _fill_placeholders(text: str, values: Dict[str, str]) -> str:
+    """Substitute {{name}} placeholders in a single pass.
+    
+    Unknown placeholders are left untouched and substituted values are
+    not rescanned, so {{variables}} inside them survive.
+    """
+    return _PLACEHOLDER_RE.sub(lambda m: values.get(m.group(1), m.group(0)), text)
+
+
+@dataclass(slots=True)
 class FeedbackEntry:
     """A single feedback entry for a generated output.
     
     Attributes:
         timestamp: ISO format timestamp when feedback was given.
         template_name: Name of the template used.
-        prompt_hash: SHA256 hash of the full prompt (for deduplication).
+        prompt_hash: BLAKE2b hash of the full prompt (for deduplication).
         output_snippet: First 200 chars of the generated output.
         rating: User rating - "up" (thumbs-up) or "down" (thumbs-down).
         correction: Optional user-provided correction (thumbs-down only).
@@ -36,9 +50,17 @@ class FeedbackEntry:
     
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization."""
-        d = asdict(self)
-        # Remove None values for cleaner JSON
-        return {k: v for k, v in d.items() if v is not None}
+        d = {
+            "timestamp": self.timestamp,
+            "template_name": self.template_name,
+            "prompt_hash": self.prompt_hash,
+            "output_snippet": self.output_snippet,
+            "rating": self.rating,
+        }
+        # Omit correction when unset for cleaner JSON
+        if self.correction is not None:
+            d["correction"] = self.correction
+        return d
     
     @classmethod
     def from_dict(cls, data: dict) -> "FeedbackEntry":
@@ -54,32 +76,91 @@ class FeedbackEntry:
 
 
 class FeedbackManager:
-    """Manages feedback storage and retrieval."""
+    """Manages feedback storage and retrieval.
+    
+    Entries are stored one JSON object per line, so adding feedback
+    appends a single line instead of rewriting the whole file.
+    """
     
     def __init__(self):
         self._entries: List[FeedbackEntry] = []
-        self._path = get_config_dir() / "feedback.json"
+        # Per-template lookups, kept in sync with _entries
+        self._by_template: Dict[str, List[FeedbackEntry]] = {}
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._path = get_config_dir() / "feedback.jsonl"
+        self._legacy_path = get_config_dir() / "feedback.json"
         self._load()
     
     def _load(self):
-        """Load feedback from disk."""
+        """Load feedback from disk, migrating the legacy JSON file if needed."""
+        if not self._path.exists() and self._legacy_path.exists():
+            self._migrate_legacy()
+        
+        entries = []
+        unterminated = False
         if self._path.exists():
-            try:
-                with open(self._path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                self._entries = [
-                    FeedbackEntry.from_dict(e) for e in data.get("entries", [])
-                ]
-            except (json.JSONDecodeError, KeyError, TypeError):
-                # Corrupted file - start fresh
-                self._entries = []
-    
-    def _save(self):
-        """Save feedback to disk."""
-        self._path.parent.mkdir(parents=True, exist_ok=True)
-        data = {"entries": [e.to_dict() for e in self._entries]}
-        with open(self._path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+            with open(self._path, "r", encoding="utf-8") as f:
+                for line in f:
+                    unterminated = not line.endswith("\n")
+                    if not line.strip():
+                        continue
+                    try:
+                        entries.append(FeedbackEntry.from_dict(json.loads(line)))
+                    except (json.JSONDecodeError, AttributeError, TypeError):
+                        # Corrupted line (e.g. interrupted write) - skip it
+                        continue
+        self._entries = entries
+        
+        self._by_template = {}
+        self._counts = {}
+        for entry in self._entries:
+            self._index(entry)
+        
+        # An interrupted write can leave the last line without its newline;
+        # rewrite the file so the next append starts on a line of its own
+        if unterminated:
+            self.compact()
+    
+    def _migrate_legacy(self):
+        """Convert the old single-document feedback.json to JSON Lines.
+        
+        The legacy file is left in place; it is only read while the new
+        file does not exist.
+        """
+        try:
+            with open(self._legacy_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._entries = [
+                FeedbackEntry.from_dict(e) for e in data.get("entries", [])
+            ]
+        except (json.JSONDecodeError, KeyError, TypeError, AttributeError):
+            # Corrupted file - start fresh
+            self._entries = []
+        self.compact()
+    
+    def _index(self, entry: FeedbackEntry):
+        """Add an entry to the per-template lookups."""
+        self._by_template.setdefault(entry.template_name, []).append(entry)
+        counts = self._counts.setdefault(entry.template_name, {"up": 0, "down": 0})
+        if entry.rating in counts:
+            counts[entry.rating] += 1
+    
+    def _append(self, entry: FeedbackEntry):
+        """Append a single entry to the feedback file."""
+        with open_for_write(self._path, "a") as f:
+            f.write(json.dumps(entry.to_dict()) + "\n")
+    
+    def compact(self):
+        """Rewrite the feedback file from the in-memory entries.
+        
+        Drops any corrupted lines skipped during load. The file is
+        replaced atomically.
+        """
+        tmp_path = self._path.with_name(self._path.name + ".tmp")
+        with open_for_write(tmp_path) as f:
+            for entry in self._entries:
+                f.write(json.dumps(entry.to_dict()) + "\n")
+        os.replace(tmp_path, self._path)
     
     def add(
         self,
@@ -102,20 +183,21 @@ class FeedbackManager:
             The created FeedbackEntry.
         """
         entry = FeedbackEntry(
-            timestamp=datetime.now().isoformat(),
+            timestamp=datetime.now().isoformat(timespec="seconds"),
             template_name=template_name,
-            prompt_hash=hashlib.sha256(prompt.encode()).hexdigest()[:16],
+            prompt_hash=hashlib.blake2b(prompt.encode("utf-8"), digest_size=8).hexdigest(),
             output_snippet=output[:200] if output else "",
             rating=rating,
             correction=correction if correction and correction.strip() else None,
         )
         self._entries.append(entry)
-        self._save()
+        self._index(entry)
+        self._append(entry)
         return entry
     
     def get_by_template(self, template_name: str) -> List[FeedbackEntry]:
         """Get all feedback entries for a specific template."""
-        return [e for e in self._entries if e.template_name == template_name]
+        return list(self._by_template.get(template_name, []))
     
     def get_all(self) -> List[FeedbackEntry]:
         """Get all feedback entries."""
@@ -123,11 +205,7 @@ class FeedbackManager:
     
     def count_by_template(self, template_name: str) -> dict:
         """Get count of thumbs-up and thumbs-down for a template."""
-        entries = self.get_by_template(template_name)
-        return {
-            "up": sum(1 for e in entries if e.rating == "up"),
-            "down": sum(1 for e in entries if e.rating == "down"),
-        }
+        return dict(self._counts.get(template_name, {"up": 0, "down": 0}))
 
 
 # Module-level singleton
@@ -155,8 +233,6 @@ def build_improvement_prompt(template_content: str, refinements: List[str], addi
     Returns:
         A prompt string for the LLM.
     """
-    from automatr.core.templates import load_meta_template
-    
     # Load the meta-template
     meta_template = load_meta_template("template_improver")
     if not meta_template:
@@ -175,11 +251,11 @@ def build_improvement_prompt(template_content: str, refinements: List[str], addi
     
     # Manual substitution to preserve {{variables}} in template_content
     # (Template.render() strips unreplaced {{}} placeholders, which we don't want)
-    result = meta_template.content
-    result = result.replace("{{template_content}}", template_content)
-    result = result.replace("{{refinements}}", refinements_text)
-    result = result.replace("{{additional_notes}}", notes_text)
-    return result
+    return _fill_placeholders(meta_template.content, {
+        "template_content": template_content,
+        "refinements": refinements_text,
+        "additional_notes": notes_text,
+    })
 
 
 def build_generation_prompt(description: str, expected_variables: List[str]) -> str:
@@ -194,8 +270,6 @@ def build_generation_prompt(description: str, expected_variables: List[str]) ->
     Returns:
         A prompt string for the LLM.
     """
-    from automatr.core.templates import load_meta_template
-    
     # Load the meta-template
     meta_template = load_meta_template("template_generator")
     if not meta_template:
@@ -203,17 +277,13 @@ def build_generation_prompt(description: str, expected_variables: List[str]) ->
         return f"Create a prompt template for: {description}\n\nVariables: {expected_variables}"
     
     # Build variables section
-    variables_text = ""
     if expected_variables:
-        variables_lines = []
-        for var in expected_variables:
-            variables_lines.append(f"- {{{{  {var}  }}}} ")
-        variables_text = "\n".join(variables_lines)
+        variables_text = "\n".join(f"- {{{{  {var}  }}}} " for var in expected_variables)
     else:
         variables_text = "(No specific variables required - use appropriate placeholders)"
     
-    # Render the meta-template with values
-    return meta_template.render({
+    # Substitute values, keeping the {{variable}} examples in the prompt intact
+    return _fill_placeholders(meta_template.content, {
         "description": description,
         "variables": variables_text,
     })
@@ -6,16 +6,121 @@ Version history is stored in _versions/ subdirectory.
 """
 
 import json
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Iterator
 
-from automatr.core.config import get_templates_dir, get_config
+from automatr.core.config import (
+    ensure_dir,
+    forget_dir,
+    loads_json,
+    read_json,
+    write_json_atomic,
+    get_templates_dir,
+    get_config,
+)
 
+_SAFE_NAME_RE = re.compile(r"[^a-z0-9_]")
+_SAFE_FOLDER_RE = re.compile(r"[^a-zA-Z0-9_ -]")
+# {{name}} or {{ name }}; group 1 is the (unstripped) name
+_PLACEHOLDER_RE = re.compile(r"\{\{([^}]+)\}\}")
 
-@dataclass
+# Parsed JSON keyed by path: ((mtime_ns, size), data)
+_JsonCache = Dict[Path, tuple[tuple[int, int], Dict[str, Any]]]
+
+
+def _read_cached_json(
+    path: Path, cache: _JsonCache, require: Optional[bytes] = None
+) -> Optional[Dict[str, Any]]:
+    """Read a JSON file, reusing the parsed copy if it is unchanged on disk.
+    
+    Args:
+        path: Path to the JSON file.
+        cache: Cache dict to look up and store parsed data in.
+        require: If given, a file that is not already cached is only parsed
+            when its raw bytes contain this substring.
+        
+    Returns:
+        Parsed JSON data (callers must not mutate it), or None if the file
+        was skipped because it lacks ``require``.
+        
+    Raises:
+        OSError: If the file is missing or unreadable.
+        json.JSONDecodeError: If the file is not valid JSON.
+    """
+    st = path.stat()
+    key = (st.st_mtime_ns, st.st_size)
+    cached = cache.get(path)
+    if cached and cached[0] == key:
+        return cached[1]
+    
+    if require is None:
+        data = read_json(path)
+    else:
+        raw = path.read_bytes()
+        if require not in raw:
+            return None
+        data = loads_json(raw)
+    cache[path] = (key, data)
+    return data
+
+
+@lru_cache(maxsize=256)
+def _split_placeholders(content: str) -> tuple[str, ...]:
+    """Split template content into alternating literal text and names.
+    
+    Even indices are literal text, odd indices are stripped placeholder
+    names. Cached per content string, so re-rendering an unchanged
+    template (e.g. live previews) skips the regex scan.
+    """
+    parts = _PLACEHOLDER_RE.split(content)
+    parts[1::2] = [name.strip() for name in parts[1::2]]
+    return tuple(parts)
+
+
+def _safe_filename(name: str) -> str:
+    """Convert a template name to a safe file stem.
+    
+    Lowercases, replaces spaces with underscores, and drops any character
+    other than a-z, 0-9 and underscore.
+    """
+    return _SAFE_NAME_RE.sub("", name.lower().replace(" ", "_"))
+
+
+def _iter_json_files(root: Path, skip_dirs: frozenset = frozenset()) -> Iterator[Path]:
+    """Recursively yield .json files under root using os.scandir.
+    
+    Directory entries carry their file type, so this avoids a stat() per
+    entry. Symlinked directories are not descended into.
+    
+    Args:
+        root: Directory to walk.
+        skip_dirs: Directory names to skip at any depth.
+        
+    Yields:
+        Paths of JSON files.
+    """
+    stack = [os.fspath(root)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in skip_dirs:
+                            stack.append(entry.path)
+                    elif entry.name.endswith(".json") and entry.is_file():
+                        yield Path(entry.path)
+        except OSError:
+            continue
+
+
+@dataclass(slots=True)
 class Variable:
     """A variable/placeholder in a template.
     
@@ -75,7 +180,7 @@ class Variable:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Template:
     """A prompt template."""
     
@@ -92,11 +197,7 @@ class Template:
     @property
     def filename(self) -> str:
         """Generate a safe filename from the template name."""
-        # Convert to lowercase, replace spaces with underscores
-        safe = self.name.lower().replace(" ", "_")
-        # Remove non-alphanumeric characters except underscores
-        safe = re.sub(r"[^a-z0-9_]", "", safe)
-        return f"{safe}.json"
+        return f"{_safe_filename(self.name)}.json"
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
@@ -126,14 +227,15 @@ class Template:
             description=data.get("description", ""),
             trigger=data.get("trigger", ""),
             variables=variables,
-            refinements=data.get("refinements", []),
+            refinements=list(data.get("refinements", [])),
             _path=path,
         )
     
     def render(self, values: Dict[str, str]) -> str:
         """Render the template with the given variable values.
         
-        Replaces {{variable_name}} placeholders with their values.
+        Replaces {{variable_name}} placeholders with their values in a
+        single pass. Placeholders that don't name a variable are removed.
         
         Args:
             values: Dictionary of variable name -> value.
@@ -141,17 +243,13 @@ class Template:
         Returns:
             Rendered template string.
         """
-        result = self.content
-        
-        for var in self.variables:
-            placeholder = f"{{{{{var.name}}}}}"
-            value = values.get(var.name, var.default)
-            result = result.replace(placeholder, value)
-        
-        # Remove any unreplaced placeholders
-        result = re.sub(r"\{\{[^}]+\}\}", "", result)
-        
-        return result
+        if "{{" not in self.content:
+            return self.content
+        mapping = {var.name: values.get(var.name, var.default) for var in self.variables}
+        return "".join(
+            mapping.get(part, "") if i % 2 else part
+            for i, part in enumerate(_split_placeholders(self.content))
+        )
 
 
 @dataclass
@@ -198,6 +296,9 @@ class TemplateManager:
     """
     
     VERSIONS_DIR = "_versions"
+    _SKIP_DIRS = frozenset((VERSIONS_DIR, "_meta"))
+    # Below this many files, list_all() loads serially (no pool startup)
+    _PARALLEL_LOAD_MIN = 8
     
     def __init__(self, templates_dir: Optional[Path] = None):
         """Initialize TemplateManager.
@@ -206,10 +307,14 @@ class TemplateManager:
             templates_dir: Directory for template files. Uses default if None.
         """
         self.templates_dir = templates_dir or get_templates_dir()
-        self.templates_dir.mkdir(parents=True, exist_ok=True)
+        ensure_dir(self.templates_dir)
         # Create versions directory
         self._versions_dir = self.templates_dir / self.VERSIONS_DIR
-        self._versions_dir.mkdir(parents=True, exist_ok=True)
+        ensure_dir(self._versions_dir)
+        # Parsed template files, reused until their mtime or size changes
+        self._cache: _JsonCache = {}
+        # Lowercased template name -> path; rebuilt by list_all(), reset on writes
+        self._name_index: Optional[Dict[str, Path]] = None
     
     def _get_version_dir(self, template: Template) -> Path:
         """Get the version history directory for a template.
@@ -223,7 +328,7 @@ class TemplateManager:
         # Use template filename (without .json) as version subdirectory
         slug = template.filename.replace(".json", "")
         version_dir = self._versions_dir / slug
-        version_dir.mkdir(parents=True, exist_ok=True)
+        ensure_dir(version_dir)
         return version_dir
     
     def _get_max_versions(self) -> int:
@@ -258,8 +363,7 @@ class TemplateManager:
         # Save version file
         version_path = version_dir / f"v{next_version}.json"
         try:
-            with open(version_path, "w", encoding="utf-8") as f:
-                json.dump(version.to_dict(), f, indent=2)
+            write_json_atomic(version_path, version.to_dict())
         except OSError as e:
             print(f"Error saving version: {e}")
             return None
@@ -283,9 +387,7 @@ class TemplateManager:
         
         for path in version_dir.glob("v*.json"):
             try:
-                with open(path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                versions.append(TemplateVersion.from_dict(data))
+                versions.append(TemplateVersion.from_dict(read_json(path)))
             except (json.JSONDecodeError, OSError) as e:
                 print(f"Warning: Failed to load version {path}: {e}")
         
@@ -308,9 +410,7 @@ class TemplateManager:
             return None
         
         try:
-            with open(version_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            return TemplateVersion.from_dict(data)
+            return TemplateVersion.from_dict(read_json(version_path))
         except (json.JSONDecodeError, OSError) as e:
             print(f"Error loading version {version_num}: {e}")
             return None
@@ -392,6 +492,7 @@ class TemplateManager:
             import shutil
             if version_dir.exists():
                 shutil.rmtree(version_dir)
+            forget_dir(version_dir)
             return True
         except OSError as e:
             print(f"Error deleting version history: {e}")
@@ -403,26 +504,40 @@ class TemplateManager:
         Returns:
             List of Template objects, sorted by name.
         """
-        templates = []
-        for path in self.templates_dir.glob("**/*.json"):
-            # Skip version files
-            if self.VERSIONS_DIR in path.parts:
-                continue
-            # Skip meta-templates (system templates)
-            if "_meta" in path.parts:
-                continue
-            try:
-                template = self.load(path)
-                if template:
-                    templates.append(template)
-            except Exception as e:
-                print(f"Warning: Failed to load {path}: {e}")
-        
-        return sorted(templates, key=lambda t: t.name.lower())
+        # Skip version files and meta-templates (system templates)
+        paths = list(_iter_json_files(self.templates_dir, self._SKIP_DIRS))
+        if len(paths) < self._PARALLEL_LOAD_MIN:
+            loaded = [self._try_load(path) for path in paths]
+        else:
+            # Overlap file reads; results are re-sorted by name below
+            workers = min(8, os.cpu_count() or 4)
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                loaded = list(pool.map(self._try_load, paths))
+        # Lowercase each name once, for both the sort and the name index
+        keyed = sorted(((t.name.lower(), t) for t in loaded if t), key=itemgetter(0))
+        
+        # First template wins on duplicate names, as with a linear search
+        name_index: Dict[str, Path] = {}
+        for key, template in keyed:
+            name_index.setdefault(key, template._path)
+        self._name_index = name_index
+        
+        return [template for _, template in keyed]
+    
+    def _try_load(self, path: Path) -> Optional[Template]:
+        """Load a template for list_all(), reporting unexpected errors."""
+        try:
+            return self.load(path)
+        except Exception as e:
+            print(f"Warning: Failed to load {path}: {e}")
+            return None
     
     def load(self, path: Path) -> Optional[Template]:
         """Load a template from a JSON file.
         
+        The parsed file is cached, so reloading an unchanged template skips
+        the JSON parse. Each call still returns a fresh Template object.
+        
         Args:
             path: Path to the JSON file.
             
@@ -430,9 +545,7 @@ class TemplateManager:
             Template object, or None if loading failed.
         """
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            return Template.from_dict(data, path=path)
+            return Template.from_dict(_read_cached_json(path, self._cache), path=path)
         except (json.JSONDecodeError, OSError) as e:
             print(f"Error loading template {path}: {e}")
             return None
@@ -447,19 +560,31 @@ class TemplateManager:
             Template object, or None if not found.
         """
         # Create expected filename
-        safe_name = name.lower().replace(" ", "_")
-        safe_name = re.sub(r"[^a-z0-9_]", "", safe_name)
-        path = self.templates_dir / f"{safe_name}.json"
+        path = self.templates_dir / f"{_safe_filename(name)}.json"
         
         if path.exists():
             return self.load(path)
         
-        # Fallback: search all templates
-        for template in self.list_all():
-            if template.name.lower() == name.lower():
+        # Fallback: template names need not match filenames (renamed or
+        # foldered templates), so look the name up in the index
+        if self._name_index is not None:
+            template = self._get_indexed(name)
+            if template is not None:
                 return template
-        
-        return None
+        # Index not built yet, or stale after files were added, renamed or
+        # removed outside this manager: rescan once and look again
+        self.list_all()
+        return self._get_indexed(name)
+    
+    def _get_indexed(self, name: str) -> Optional[Template]:
+        """Load a template through the name index, or None on a miss."""
+        path = self._name_index.get(name.lower()) if self._name_index else None
+        if path is None or not path.exists():
+            return None
+        template = self.load(path)
+        if template is None or template.name.lower() != name.lower():
+            return None
+        return template
     
     def save(self, template: Template) -> bool:
         """Save a template to disk.
@@ -477,8 +602,9 @@ class TemplateManager:
             path = self.templates_dir / template.filename
         
         try:
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(template.to_dict(), f, indent=2)
+            write_json_atomic(path, template.to_dict())
+            self._cache.pop(path, None)
+            self._name_index = None
             template._path = path
             return True
         except OSError as e:
@@ -499,6 +625,8 @@ class TemplateManager:
         
         try:
             template._path.unlink()
+            self._cache.pop(template._path, None)
+            self._name_index = None
             return True
         except OSError as e:
             print(f"Error deleting template: {e}")
@@ -542,12 +670,24 @@ class TemplateManager:
     def iter_with_triggers(self) -> Iterator[Template]:
         """Iterate over templates that have Espanso triggers.
         
+        Only files whose raw JSON mentions "trigger" are parsed, so
+        untriggered templates cost a read but no JSON decode.
+        
         Yields:
             Templates with non-empty trigger field.
         """
-        for template in self.list_all():
-            if template.trigger:
-                yield template
+        templates = []
+        for path in _iter_json_files(self.templates_dir, self._SKIP_DIRS):
+            try:
+                # Files without a "trigger" key can't have one; skip the parse
+                data = _read_cached_json(path, self._cache, require=b'"trigger"')
+                if isinstance(data, dict) and data.get("trigger"):
+                    templates.append(Template.from_dict(data, path=path))
+            except Exception as e:
+                print(f"Warning: Failed to load {path}: {e}")
+        
+        templates.sort(key=lambda t: t.name.lower())
+        yield from templates
     
     def list_folders(self) -> List[str]:
         """List all category folders.
@@ -556,11 +696,36 @@ class TemplateManager:
             List of folder names (relative to templates_dir), sorted alphabetically.
             Excludes the _versions directory used for version history.
         """
-        folders = []
-        for path in self.templates_dir.iterdir():
-            if path.is_dir() and path.name != self.VERSIONS_DIR:
-                folders.append(path.name)
-        return sorted(folders, key=str.lower)
+        with os.scandir(self.templates_dir) as it:
+            folders = [
+                entry.name
+                for entry in it
+                if entry.name != self.VERSIONS_DIR and entry.is_dir()
+            ]
+        folders.sort(key=str.lower)
+        return folders
+    
+    def list_by_folder(self) -> Dict[str, List[Template]]:
+        """List all templates grouped by folder, in one pass.
+        
+        Equivalent to calling get_template_folder() on every template from
+        list_all(), with list_folders() supplying the empty folders.
+        
+        Returns:
+            Dict mapping folder name ("" for the root) to its templates,
+            with an empty list for every folder that has none. Each list
+            keeps list_all()'s name order.
+        """
+        by_folder: Dict[str, List[Template]] = {"": []}
+        for folder in self.list_folders():
+            by_folder[folder] = []
+        
+        root = self.templates_dir
+        for template in self.list_all():
+            parent = template._path.parent if template._path else root
+            folder = "" if parent == root else parent.name
+            by_folder.setdefault(folder, []).append(template)
+        return by_folder
     
     def create_folder(self, name: str) -> bool:
         """Create a new category folder.
@@ -572,7 +737,7 @@ class TemplateManager:
             True if created successfully, False otherwise.
         """
         # Sanitize folder name
-        safe_name = re.sub(r"[^a-zA-Z0-9_ -]", "", name).strip()
+        safe_name = _SAFE_FOLDER_RE.sub("", name).strip()
         if not safe_name:
             return False
         
@@ -600,12 +765,14 @@ class TemplateManager:
             return False, "Folder does not exist."
         
         # Check if folder has templates
-        templates_in_folder = list(folder_path.glob("*.json"))
-        if templates_in_folder:
-            return False, f"Cannot delete folder '{name}' because it contains {len(templates_in_folder)} template(s). Move or delete them first."
+        with os.scandir(folder_path) as it:
+            template_count = sum(1 for entry in it if entry.name.endswith(".json"))
+        if template_count:
+            return False, f"Cannot delete folder '{name}' because it contains {template_count} template(s). Move or delete them first."
         
         try:
             folder_path.rmdir()
+            forget_dir(folder_path)
             return True, ""
         except OSError as e:
             return False, str(e)
@@ -640,7 +807,7 @@ class TemplateManager:
         # Determine target directory
         if folder:
             target_dir = self.templates_dir / folder
-            target_dir.mkdir(parents=True, exist_ok=True)
+            ensure_dir(target_dir)
         else:
             target_dir = self.templates_dir
         
@@ -649,12 +816,14 @@ class TemplateManager:
         new_path = target_dir / template.filename
         
         try:
-            with open(new_path, "w", encoding="utf-8") as f:
-                json.dump(template.to_dict(), f, indent=2)
+            write_json_atomic(new_path, template.to_dict())
+            self._cache.pop(new_path, None)
+            self._name_index = None
             
             # Remove old file if we moved it
             if old_path and old_path != new_path and old_path.exists():
                 old_path.unlink()
+                self._cache.pop(old_path, None)
             
             template._path = new_path
             return True
@@ -712,10 +881,19 @@ def get_user_meta_templates_dir() -> Path:
         Path to user's _meta directory.
     """
     user_meta = get_templates_dir() / "_meta"
-    user_meta.mkdir(parents=True, exist_ok=True)
+    ensure_dir(user_meta)
     return user_meta
 
 
+# Parsed meta-template files, shared by the bundled and user copies
+_meta_cache: _JsonCache = {}
+
+
+def _read_meta_data(path: Path) -> Dict[str, Any]:
+    """Read a meta-template JSON file, reusing the parsed copy if unchanged."""
+    return _read_cached_json(path, _meta_cache)
+
+
 def load_meta_template(name: str) -> Optional[Template]:
     """Load a meta-template by name from the _meta directory.
     
@@ -723,6 +901,7 @@ def load_meta_template(name: str) -> Optional[Template]:
     "Improve Template" and "Generate Template".
     
     Checks user's _meta directory first, then falls back to bundled.
+    Parsed files are cached until their mtime or size changes.
     
     Args:
         name: Template name (without .json extension), e.g., "template_improver"
@@ -732,23 +911,19 @@ def load_meta_template(name: str) -> Optional[Template]:
     """
     # Check user's directory first
     user_path = get_templates_dir() / "_meta" / f"{name}.json"
-    if user_path.exists():
-        try:
-            with open(user_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            return Template.from_dict(data, path=user_path)
-        except (json.JSONDecodeError, OSError):
-            pass
+    try:
+        return Template.from_dict(_read_meta_data(user_path), path=user_path)
+    except (json.JSONDecodeError, OSError):
+        pass
     
     # Fall back to bundled
     bundled_path = get_bundled_meta_templates_dir() / f"{name}.json"
-    if bundled_path.exists():
-        try:
-            with open(bundled_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            return Template.from_dict(data, path=bundled_path)
-        except (json.JSONDecodeError, OSError) as e:
-            print(f"Error loading meta-template {name}: {e}")
+    try:
+        return Template.from_dict(_read_meta_data(bundled_path), path=bundled_path)
+    except FileNotFoundError:
+        pass
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"Error loading meta-template {name}: {e}")
     
     return None
 
@@ -777,8 +952,8 @@ def save_meta_template(name: str, content: str) -> bool:
     # Save to user's directory
     user_path = get_user_meta_templates_dir() / f"{name}.json"
     try:
-        with open(user_path, "w", encoding="utf-8") as f:
-            json.dump(template.to_dict(), f, indent=2)
+        write_json_atomic(user_path, template.to_dict())
+        _meta_cache.pop(user_path, None)
         return True
     except OSError as e:
         print(f"Error saving meta-template {name}: {e}")
@@ -819,11 +994,8 @@ def get_bundled_meta_template_content(name: str) -> Optional[str]:
         Template content string, or None if not found.
     """
     bundled_path = get_bundled_meta_templates_dir() / f"{name}.json"
-    if bundled_path.exists():
-        try:
-            with open(bundled_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            return data.get("content", "")
-        except (json.JSONDecodeError, OSError):
-            pass
+    try:
+        return _read_meta_data(bundled_path).get("content", "")
+    except (json.JSONDecodeError, OSError):
+        pass
     return None
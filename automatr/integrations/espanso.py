@@ -3,142 +3,325 @@
 Generates Espanso match files from templates that have triggers defined.
 """
 
-import platform
+import os
+import re
+import threading
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
-import yaml
-
-from automatr.core.config import get_config
+from automatr.core.config import get_config, get_platform
 from automatr.core.templates import get_template_manager
 
 
+# {{...}} placeholder; group 1 is the inner text including any padding
+_PLACEHOLDER_RE = re.compile(r"\{\{([^}]+)\}\}")
+
+
 def _convert_to_espanso_placeholders(content: str, variables) -> str:
     """Convert template placeholders {{var}} to Espanso placeholders.
     
     Form variables use {{var.value}} for accessing the value.
     Date and other simple types use {{var}} directly.
     """
-    updated = content
-    for var in variables:
-        name = var.name
-        var_type = getattr(var, 'type', 'form')
-        
-        if var_type == "form":
-            # Form variables with layout return objects; access via .value
-            updated = updated.replace(f"{{{{{name}}}}}", f"{{{{{name}.value}}}}")
-            updated = updated.replace(f"{{{{ {name} }}}}", f"{{{{{name}.value}}}}")
-        # Date and other simple types use {{var}} directly (no conversion needed)
-    return updated
+    # Form variables with layout return objects; access via .value
+    form_names = {
+        var.name for var in variables if getattr(var, 'type', 'form') == "form"
+    }
+    if not form_names or "{{" not in content:
+        return content
+    
+    def _convert(match: re.Match) -> str:
+        name = match.group(1)
+        # Accept {{name}} and {{ name }}
+        if len(name) > 2 and name[0] == " " and name[-1] == " ":
+            name = name[1:-1]
+        if name in form_names:
+            return f"{{{{{name}.value}}}}"
+        return match.group(0)
+    
+    # Date and other simple types use {{var}} directly (no conversion needed)
+    return _PLACEHOLDER_RE.sub(_convert, content)
 
 
 def _build_espanso_var_entry(var) -> dict:
     """Build an Espanso variable entry from a Variable object."""
     var_type = getattr(var, 'type', 'form')
-    params = getattr(var, 'params', {})
     
     if var_type == "date":
-        var_entry = {
-            "name": var.name,
-            "type": "date",
-        }
+        params = getattr(var, 'params', {})
         if params:
-            var_entry["params"] = params
-        return var_entry
+            return {"name": var.name, "type": "date", "params": params}
+        return {"name": var.name, "type": "date"}
     
     # Default: form type
-    var_entry = {
+    # Espanso v2 forms require [[value]] placeholder
+    layout = f"{var.label}: [[value]]"
+    return {
         "name": var.name,
         "type": "form",
-        "params": {
-            # Espanso v2 forms require [[value]] placeholder
-            "layout": f"{var.label}: [[value]]",
-        },
+        "params": {"layout": layout, "default": var.default} if var.default else {"layout": layout},
     }
-    if var.default:
-        var_entry["params"]["default"] = var.default
-    return var_entry
+
+
+def _build_match_entry(template) -> dict:
+    """Build an Espanso match entry for a template with a trigger."""
+    # Use Espanso form placeholders in the replacement text
+    match_entry = {
+        "trigger": template.trigger,
+        "replace": _convert_to_espanso_placeholders(template.content, template.variables or []),
+    }
+    if template.variables:
+        match_entry["vars"] = [_build_espanso_var_entry(var) for var in template.variables]
+    return match_entry
+
+
+# Built match entries keyed by template path: ((mtime_ns, size), entry)
+_MatchCache = Dict[Path, tuple[tuple[int, int], dict]]
+
+
+def _build_matches(cache: _MatchCache) -> List[dict]:
+    """Build match entries for all triggered templates, in name order.
+    
+    Entries for template files unchanged since the last sync are reused
+    instead of rebuilt. The cache is left holding only the templates seen
+    by this sync, so deleted or renamed files do not accumulate.
+    
+    Args:
+        cache: Match cache to reuse and refresh.
+    """
+    seen: _MatchCache = {}
+    matches = []
+    for template in get_template_manager().iter_with_triggers():
+        path = template._path
+        try:
+            st = path.stat()
+            key = (st.st_mtime_ns, st.st_size)
+        except (AttributeError, OSError):
+            matches.append(_build_match_entry(template))
+            continue
+        
+        cached = cache.get(path)
+        if cached and cached[0] == key:
+            seen[path] = cached
+            matches.append(cached[1])
+            continue
+        
+        match_entry = _build_match_entry(template)
+        seen[path] = (key, match_entry)
+        matches.append(match_entry)
+    
+    cache.clear()
+    cache.update(seen)
+    return matches
+
+
+def _dump_matches(matches: list) -> bytes:
+    """Serialize Espanso match entries to the automatr.yml payload."""
+    # Imported here so yaml is only loaded when something is actually synced
+    import yaml
+    try:
+        from yaml import CSafeDumper as _YamlDumper  # libyaml C emitter
+    except ImportError:
+        from yaml import SafeDumper as _YamlDumper
+    
+    return yaml.dump(
+        {"matches": matches},
+        Dumper=_YamlDumper,
+        default_flow_style=False,
+        allow_unicode=True,
+    ).encode("utf-8")
+
+
+def _write_if_changed(path: Path, data: bytes) -> bool:
+    """Atomically write data to path unless the file already holds exactly that.
+    
+    Returns:
+        True if the file was written, False if it was already up to date.
+        
+    Raises:
+        OSError: If the file cannot be written.
+    """
+    try:
+        if path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    # Write beside the target and rename over it, so Espanso's file
+    # watcher never picks up a half-written file
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+def _first_existing(paths: Iterable[Path]) -> Optional[Path]:
+    """Return the first path that exists, stopping at the first hit.
+    
+    Uses one os.stat() per candidate; pass a generator to avoid even
+    building the candidates after the match.
+    """
+    for path in paths:
+        try:
+            os.stat(path)
+        except OSError:
+            continue
+        return path
+    return None
+
+
+# Windows profile folders that never hold a user's Espanso config
+_WINDOWS_SYSTEM_PROFILES = frozenset(("All Users", "Default", "Default User", "Public"))
+
+
+# Espanso config locations inside a Windows profile, in preference order
+_PROFILE_ESPANSO_DIRS = (
+    ".config/espanso",  # Prefer Espanso v2 default on Windows
+    ".espanso",
+    "AppData/Roaming/espanso",
+)
+
+
+def _profile_espanso_dir(home: Path) -> Optional[Path]:
+    """Return the Espanso config directory inside a Windows profile, if any."""
+    return _first_existing(home / rel for rel in _PROFILE_ESPANSO_DIRS)
+
+
+def _windows_username() -> Optional[str]:
+    """Ask Windows for %USERNAME% from inside WSL2.
+    
+    Uses wslvar (from wslu) when installed, otherwise cmd.exe.
+    
+    Returns:
+        The Windows user name, or None if it could not be determined.
+    """
+    import subprocess
+    import shutil
+    
+    if shutil.which("wslvar"):
+        cmd = ["wslvar", "USERNAME"]
+    else:
+        cmd = ["cmd.exe", "/c", "echo %USERNAME%"]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    name = result.stdout.strip()
+    if not name or name == "%USERNAME%":
+        return None
+    return name
+
+
+def _find_wsl_windows_espanso_dir() -> Optional[Path]:
+    """Find the Windows-side Espanso config directory from inside WSL2.
+    
+    Looks under the Windows user profiles on /mnt/c, trying in order:
+    USERPROFILE (when forwarded via WSLENV), the profile matching the
+    WSL user name, and the only profile holding an Espanso directory.
+    When several profiles have one, Windows is asked for %USERNAME%
+    rather than guessing, so another user's Espanso is never picked.
+    
+    Returns:
+        Path to the Espanso config directory, or None if not found.
+    """
+    users_root = Path("/mnt/c/Users")
+    
+    def own_homes() -> Iterator[Path]:
+        profile = os.environ.get("USERPROFILE")
+        if profile:
+            yield Path(profile)
+        user = os.environ.get("USER")
+        if user:
+            yield users_root / user
+    
+    for home in own_homes():
+        found = _profile_espanso_dir(home)
+        if found:
+            return found
+    
+    try:
+        with os.scandir(users_root) as it:
+            names = [
+                entry.name for entry in it
+                if entry.name not in _WINDOWS_SYSTEM_PROFILES and entry.is_dir()
+            ]
+    except OSError:
+        names = None
+    
+    if names is not None:
+        found_dirs = [
+            found for found in (_profile_espanso_dir(users_root / name) for name in names)
+            if found
+        ]
+        if not found_dirs:
+            return None
+        if len(found_dirs) == 1:
+            return found_dirs[0]
+    
+    # Several candidate profiles (or none readable): ask Windows which is ours
+    win_user = _windows_username()
+    if win_user:
+        return _profile_espanso_dir(users_root / win_user)
+    return None
+
+
+# (configured espanso.config_path, detected directory) from the last
+# successful lookup; failed lookups are not cached, so an Espanso install
+# made while the app runs is still picked up
+_config_dir_cache: Optional[Tuple[str, Path]] = None
+# (config directory, match directory) last created by get_match_dir
+_match_dir_cache: Optional[Tuple[Path, Path]] = None
 
 
 def get_espanso_config_dir() -> Optional[Path]:
     """Get the Espanso configuration directory.
     
+    A found directory is remembered until espanso.config_path changes.
+    
     Returns:
         Path to Espanso config directory, or None if not found.
     """
-    config = get_config()
+    global _config_dir_cache
+    configured = get_config().espanso.config_path
+    if _config_dir_cache and _config_dir_cache[0] == configured:
+        return _config_dir_cache[1]
     
+    found = _detect_espanso_config_dir(configured)
+    _config_dir_cache = (configured, found) if found else None
+    return found
+
+
+def _detect_espanso_config_dir(configured: str) -> Optional[Path]:
+    """Locate the Espanso configuration directory (uncached)."""
     # Use configured path if set
-    if config.espanso.config_path:
-        path = Path(config.espanso.config_path).expanduser()
-        if path.exists():
+    if configured:
+        path = Path(configured).expanduser()
+        if _first_existing((path,)):
             return path
     
     # Auto-detect based on platform
-    system = platform.system()
+    system = get_platform()
     
-    # Check if running in WSL2
-    is_wsl2 = False
-    if system == "Linux":
-        try:
-            with open("/proc/version", "r") as f:
-                version = f.read().lower()
-                is_wsl2 = "microsoft" in version or "wsl" in version
-        except Exception:
-            pass
+    if system == "wsl2":
+        found = _find_wsl_windows_espanso_dir()
+        if found:
+            return found
     
-    if is_wsl2:
-        # Try to find Windows user and use Windows Espanso path
-        try:
-            import subprocess
-            result = subprocess.run(
-                ["cmd.exe", "/c", "echo %USERNAME%"],
-                capture_output=True,
-                text=True,
-                timeout=5,
-            )
-            win_user = result.stdout.strip()
-            if win_user:
-                # Prefer Espanso v2 default on Windows
-                config_path = Path(f"/mnt/c/Users/{win_user}/.config/espanso")
-                if config_path.exists():
-                    return config_path
-
-                legacy_path = Path(f"/mnt/c/Users/{win_user}/.espanso")
-                if legacy_path.exists():
-                    return legacy_path
-
-                appdata_path = Path(f"/mnt/c/Users/{win_user}/AppData/Roaming/espanso")
-                if appdata_path.exists():
-                    return appdata_path
-        except Exception:
-            pass
-    
-    # Standard paths
-    candidates = []
-    
-    if system == "Linux":
-        candidates = [
-            Path.home() / ".config" / "espanso",
-            Path.home() / ".espanso",
-        ]
-    elif system == "Darwin":  # macOS
-        candidates = [
-            Path.home() / "Library" / "Application Support" / "espanso",
-            Path.home() / ".config" / "espanso",
-        ]
-    elif system == "Windows":
-        import os
-        appdata = os.environ.get("APPDATA", "")
-        if appdata:
-            candidates.append(Path(appdata) / "espanso")
-        candidates.append(Path.home() / ".espanso")
-    
-    for path in candidates:
-        if path.exists():
-            return path
+    # Standard paths, probed lazily in preference order
+    def candidates() -> Iterator[Path]:
+        if system in ("linux", "wsl2"):
+            yield Path.home() / ".config" / "espanso"
+            yield Path.home() / ".espanso"
+        elif system == "macos":
+            yield Path.home() / "Library" / "Application Support" / "espanso"
+            yield Path.home() / ".config" / "espanso"
+        elif system == "windows":
+            appdata = os.environ.get("APPDATA", "")
+            if appdata:
+                yield Path(appdata) / "espanso"
+            yield Path.home() / ".espanso"
     
-    return None
+    return _first_existing(candidates())
 
 
 def get_match_dir() -> Optional[Path]:
@@ -147,15 +330,59 @@ def get_match_dir() -> Optional[Path]:
     Returns:
         Path to match directory, or None if not found.
     """
+    global _match_dir_cache
     config_dir = get_espanso_config_dir()
     if not config_dir:
         return None
+    if _match_dir_cache and _match_dir_cache[0] == config_dir:
+        return _match_dir_cache[1]
     
     match_dir = config_dir / "match"
     match_dir.mkdir(parents=True, exist_ok=True)
+    _match_dir_cache = (config_dir, match_dir)
     return match_dir
 
 
+# monotonic() time of the last detached WSL2 restart, for debouncing
+_last_wsl_restart = 0.0
+_WSL_RESTART_DEBOUNCE = 2.0  # seconds
+
+
+def _restart_windows_espanso_detached() -> bool:
+    """Restart the Windows Espanso service from WSL2 without waiting.
+    
+    Stop and start run in a single background PowerShell process, so a
+    sync returns immediately. Restarts requested within
+    _WSL_RESTART_DEBOUNCE seconds of the previous one are coalesced.
+    
+    Returns:
+        True if a restart was launched (or one was just launched),
+        False if PowerShell could not be started.
+    """
+    global _last_wsl_restart
+    now = time.monotonic()
+    if now - _last_wsl_restart < _WSL_RESTART_DEBOUNCE:
+        return True
+    
+    import subprocess
+    try:
+        # Start as detached process (avoids WSL console issues)
+        subprocess.Popen(
+            ["powershell.exe", "-NoProfile", "-Command",
+             "cd C:/; espanso service stop; "
+             "Start-Process espanso -ArgumentList 'service','start' -WindowStyle Hidden"],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            close_fds=True,
+            start_new_session=True,
+        )
+    except OSError:
+        return False
+    _last_wsl_restart = now
+    return True
+
+
 def sync_to_espanso() -> bool:
     """Sync templates to Espanso match file.
     
@@ -170,71 +397,28 @@ def sync_to_espanso() -> bool:
         print("Error: Could not find Espanso config directory")
         return False
     
-    template_manager = get_template_manager()
-    matches = []
-    
-    for template in template_manager.iter_with_triggers():
-        # Build Espanso match entry; use Espanso form placeholders in replacement
-        replace_text = _convert_to_espanso_placeholders(template.content, template.variables or [])
-        match_entry = {
-            "trigger": template.trigger,
-            "replace": replace_text,
-        }
-        
-        # Add variables if present
-        if template.variables:
-            match_entry["vars"] = []
-            for var in template.variables:
-                var_entry = _build_espanso_var_entry(var)
-                match_entry["vars"].append(var_entry)
-        
-        matches.append(match_entry)
-    
-    if not matches:
-        print("No templates with triggers found")
-        return True
-    
     # Write YAML file
     output_path = match_dir / "automatr.yml"
     try:
-        content = {"matches": matches}
-        with open(output_path, "w", encoding="utf-8") as f:
-            yaml.dump(content, f, default_flow_style=False, allow_unicode=True)
+        count, changed = get_espanso_manager().write_matches(output_path)
         
-        print(f"Synced {len(matches)} triggers to {output_path}")
+        if not count:
+            print("No templates with triggers found")
+            return True
         
-        # Check if running in WSL2 - file watcher may not detect changes
-        is_wsl2 = False
-        if platform.system() == "Linux":
-            try:
-                with open("/proc/version", "r") as f:
-                    version = f.read().lower()
-                    is_wsl2 = "microsoft" in version or "wsl" in version
-            except Exception:
-                pass
+        if not changed:
+            # Nothing changed, so Espanso needs no reload either
+            print(f"Espanso triggers already up to date ({count} in {output_path})")
+            return True
+        
+        print(f"Synced {count} triggers to {output_path}")
         
-        if is_wsl2:
+        # Check if running in WSL2 - file watcher may not detect changes
+        if get_platform() == "wsl2":
             # WSL2 file writes don't trigger Windows file watcher; restart Espanso
-            try:
-                import subprocess
-                # Stop espanso first
-                subprocess.run(
-                    ["powershell.exe", "-NoProfile", "-Command", "cd C:/; espanso service stop"],
-                    capture_output=True,
-                    timeout=10,
-                )
-                # Start as detached process (avoids WSL console issues)
-                result = subprocess.run(
-                    ["powershell.exe", "-NoProfile", "-Command", 
-                     "cd C:/; Start-Process espanso -ArgumentList 'service','start' -WindowStyle Hidden"],
-                    capture_output=True,
-                    timeout=10,
-                )
-                if result.returncode == 0:
-                    print("Espanso restarted successfully.")
-                else:
-                    print("Note: Run 'espanso restart' from Windows PowerShell to reload triggers.")
-            except Exception:
+            if _restart_windows_espanso_detached():
+                print("Restarting Espanso in the background...")
+            else:
                 print("Note: Run 'espanso restart' from Windows PowerShell to reload triggers.")
         
         return True
@@ -252,24 +436,17 @@ def restart_espanso() -> bool:
     import subprocess
     import shutil
     
-    # Check if running in WSL2
-    is_wsl2 = False
-    if platform.system() == "Linux":
-        try:
-            with open("/proc/version", "r") as f:
-                version = f.read().lower()
-                is_wsl2 = "microsoft" in version or "wsl" in version
-        except Exception:
-            pass
-    
-    if is_wsl2:
-        # Restart Windows Espanso via PowerShell
+    if get_platform() == "wsl2":
+        # Run espanso.exe directly through WSL interop when it is on PATH
+        # (Windows PATH is appended by default), so only one Windows process
+        # is created; otherwise go through PowerShell
+        windows_espanso = shutil.which("espanso.exe")
+        if windows_espanso:
+            cmd = [windows_espanso, "restart"]
+        else:
+            cmd = ["powershell.exe", "-Command", "espanso restart"]
         try:
-            subprocess.run(
-                ["powershell.exe", "-Command", "espanso restart"],
-                capture_output=True,
-                timeout=10,
-            )
+            subprocess.run(cmd, capture_output=True, timeout=10)
             return True
         except Exception:
             pass
@@ -289,46 +466,65 @@ class EspansoManager:
     """Manager for Espanso integration."""
     
     def __init__(self):
-        self.config_dir = get_espanso_config_dir()
-        self.match_dir = get_match_dir()
+        self._match_cache: _MatchCache = {}
+        # Serializes syncs, e.g. a manual sync on the GUI thread and an
+        # auto-sync worker, which share the match cache and the temp file
+        self._sync_lock = threading.RLock()
+    
+    @property
+    def config_dir(self) -> Optional[Path]:
+        """Espanso config directory, looked up again until one is found."""
+        return get_espanso_config_dir()
+    
+    @property
+    def match_dir(self) -> Optional[Path]:
+        """Espanso match directory, looked up again until one is found."""
+        return get_match_dir()
     
     def is_available(self) -> bool:
         """Check if Espanso is available."""
         return self.match_dir is not None
     
-    def sync(self) -> int:
-        """Sync templates to Espanso and return count of synced templates."""
-        if not self.match_dir:
-            return 0
+    def build_matches(self) -> List[dict]:
+        """Build match entries for all triggered templates.
+        
+        Entries for templates unchanged since this manager's last build
+        are reused.
+        """
+        with self._sync_lock:
+            return _build_matches(self._match_cache)
+    
+    def write_matches(self, output_path: Path) -> Tuple[int, bool]:
+        """Build the match entries and write them to output_path.
         
-        template_manager = get_template_manager()
-        matches = []
+        Concurrent calls run one at a time. Nothing is written when no
+        template has a trigger.
         
-        for template in template_manager.iter_with_triggers():
-            replace_text = _convert_to_espanso_placeholders(template.content, template.variables or [])
-            match_entry = {
-                "trigger": template.trigger,
-                "replace": replace_text,
-            }
+        Args:
+            output_path: Match file to write.
             
-            if template.variables:
-                match_entry["vars"] = []
-                for var in template.variables:
-                    var_entry = _build_espanso_var_entry(var)
-                    match_entry["vars"].append(var_entry)
+        Returns:
+            Tuple of (number of matches, whether the file was changed).
             
-            matches.append(match_entry)
-        
-        if not matches:
+        Raises:
+            OSError: If the file cannot be written.
+        """
+        with self._sync_lock:
+            matches = self.build_matches()
+            if not matches:
+                return 0, False
+            return len(matches), _write_if_changed(output_path, _dump_matches(matches))
+    
+    def sync(self) -> int:
+        """Sync templates to Espanso and return count of synced templates."""
+        match_dir = self.match_dir
+        if not match_dir:
             return 0
         
         # Write YAML file
-        output_path = self.match_dir / "automatr.yml"
         try:
-            content = {"matches": matches}
-            with open(output_path, "w", encoding="utf-8") as f:
-                yaml.dump(content, f, default_flow_style=False, allow_unicode=True)
-            return len(matches)
+            count, _ = self.write_matches(match_dir / "automatr.yml")
+            return count
         except Exception:
             return 0
     
@@ -4,18 +4,53 @@ Manages the llama.cpp server process and provides an HTTP client
 for sending prompts.
 """
 
+import json
 import os
 import shutil
 import signal
+import socket
+import stat
 import subprocess
+import sys
+import threading
 import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterator, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
 
-import requests
+from automatr.core.config import get_config, get_config_manager, loads_json
 
-from automatr.core.config import get_config, get_config_manager
+# Popen kwargs that detach llama-server from our terminal's signals. A new
+# process group (3.11+) is enough for that and is cheaper in the child than
+# a whole new session.
+if sys.version_info >= (3, 11):
+    _DETACH_KWARGS: Dict[str, object] = {"process_group": 0}
+else:
+    _DETACH_KWARGS = {"start_new_session": True}
+
+# Home directory, resolved once for the binary and model path lookups
+_HOME = Path.home()
+
+
+def _expand_user(path: str) -> Path:
+    """Like Path(path).expanduser(), but reusing _HOME for '~' and '~/...'."""
+    if path == "~" or path.startswith(("~/", "~" + os.sep)):
+        return _HOME / path[2:]
+    return Path(path).expanduser()
+
+
+def _is_executable(path: Path) -> bool:
+    """Check for an executable regular file with a single os.stat().
+    
+    Tests the permission bits instead of following up with os.access(),
+    which would stat the file a second time.
+    """
+    try:
+        mode = os.stat(path).st_mode
+    except OSError:
+        return False
+    return stat.S_ISREG(mode) and bool(mode & 0o111)
 
 
 @dataclass
@@ -29,7 +64,11 @@ class ModelInfo:
     @classmethod
     def from_path(cls, path: Path) -> "ModelInfo":
         """Create ModelInfo from a file path."""
-        size_bytes = path.stat().st_size
+        return cls.from_size(path, path.stat().st_size)
+    
+    @classmethod
+    def from_size(cls, path: Path, size_bytes: int) -> "ModelInfo":
+        """Create ModelInfo from a path whose size is already known."""
         size_gb = size_bytes / (1024 ** 3)
         return cls(
             path=path,
@@ -38,6 +77,47 @@ class ModelInfo:
         )
 
 
+def _scan_models(root: Path) -> Tuple[List[ModelInfo], Dict[str, int]]:
+    """Recursively collect .gguf models under root using os.scandir.
+    
+    Sizes and directory mtimes come from DirEntry.stat(), which is cached
+    on the entry. Symlinked directories are not descended into (as with
+    rglob); symlinked model files are included.
+    
+    Returns:
+        Tuple of (models, {directory: mtime_ns} for every directory walked).
+        
+    Raises:
+        OSError: If root itself cannot be read.
+    """
+    models: List[ModelInfo] = []
+    dir_mtimes = {os.fspath(root): os.stat(root).st_mtime_ns}
+    stack = [os.fspath(root)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            dir_mtimes[entry.path] = entry.stat(follow_symlinks=False).st_mtime_ns
+                            stack.append(entry.path)
+                        elif entry.name.endswith(".gguf") and entry.is_file():
+                            models.append(ModelInfo.from_size(Path(entry.path), entry.stat().st_size))
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return models, dir_mtimes
+
+
+def _mtimes_unchanged(dir_mtimes: Dict[str, int]) -> bool:
+    """Check that every directory still has its recorded mtime."""
+    try:
+        return all(os.stat(d).st_mtime_ns == m for d, m in dir_mtimes.items())
+    except OSError:
+        return False
+
+
 class LLMClient:
     """HTTP client for communicating with llama-server."""
     
@@ -49,6 +129,46 @@ class LLMClient:
         """
         self.base_url = base_url.rstrip("/")
         self.timeout = 120  # 2 minutes for generation
+        parts = urlsplit(self.base_url)
+        self._address = (parts.hostname or "localhost", parts.port or 80)
+        # Created on first HTTP call, so requests is only imported if used
+        self._http_session = None
+        self._session_lock = threading.Lock()
+    
+    @property
+    def _session(self):
+        """The shared requests.Session, reusing keep-alive connections.
+        
+        Created once even when first used from two threads at a time.
+        """
+        session = self._http_session
+        if session is None:
+            with self._session_lock:
+                if self._http_session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=0)
+                    session.mount("http://", adapter)
+                    self._http_session = session
+                session = self._http_session
+        return session
+    
+    def port_open(self, timeout: float = 0.1) -> bool:
+        """Check whether anything is listening on the server's port.
+        
+        A bare TCP connect, so a stopped server is detected in well under
+        a millisecond instead of going through an HTTP request.
+        
+        Returns:
+            True if the port accepts connections, False otherwise.
+        """
+        try:
+            with socket.create_connection(self._address, timeout=timeout):
+                return True
+        except OSError:
+            return False
     
     def health_check(self) -> bool:
         """Check if the server is healthy.
@@ -56,8 +176,10 @@ class LLMClient:
         Returns:
             True if server is responding, False otherwise.
         """
+        import requests
+        
         try:
-            response = requests.get(f"{self.base_url}/health", timeout=5)
+            response = self._session.get(f"{self.base_url}/health", timeout=5)
             return response.status_code == 200
         except requests.RequestException:
             return False
@@ -111,6 +233,8 @@ class LLMClient:
             ConnectionError: If server is not reachable.
             RuntimeError: If generation fails.
         """
+        import requests
+        
         # Read settings from config (allows live tuning)
         config = get_config().llm
         payload = {
@@ -124,7 +248,7 @@ class LLMClient:
         }
         
         try:
-            response = requests.post(
+            response = self._session.post(
                 f"{self.base_url}/completion",
                 json=payload,
                 timeout=self.timeout,
@@ -163,6 +287,8 @@ class LLMClient:
         Yields:
             Generated text tokens.
         """
+        import requests
+        
         # Read settings from config (allows live tuning)
         config = get_config().llm
         payload = {
@@ -176,7 +302,7 @@ class LLMClient:
         }
         
         try:
-            with requests.post(
+            with self._session.post(
                 f"{self.base_url}/completion",
                 json=payload,
                 stream=True,
@@ -185,19 +311,16 @@ class LLMClient:
                 response.raise_for_status()
                 
                 for line in response.iter_lines():
-                    if line:
-                        # Parse SSE format
-                        line_str = line.decode("utf-8")
-                        if line_str.startswith("data: "):
-                            import json
-                            try:
-                                data = json.loads(line_str[6:])
-                                content = data.get("content", "")
-                                if content:
-                                    yield content
-                            except json.JSONDecodeError:
-                                continue
-                        
+                    # Parse SSE format straight from bytes (no per-line decode)
+                    if line.startswith(b"data: "):
+                        try:
+                            data = loads_json(line[6:])
+                        except json.JSONDecodeError:
+                            continue
+                        content = data.get("content", "")
+                        if content:
+                            yield content
+                
         except requests.RequestException as e:
             raise RuntimeError(f"Streaming failed: {e}")
 
@@ -209,6 +332,15 @@ class LLMServerManager:
         """Initialize the server manager."""
         self.config = get_config().llm
         self._process: Optional[subprocess.Popen] = None
+        # (configured server_binary, resolved path) from the last search
+        self._binary_cache: Optional[Tuple[str, Path]] = None
+        # (search root, {directory: mtime_ns}, models) from the last scan
+        self._models_cache: Optional[Tuple[Path, Dict[str, int], List[ModelInfo]]] = None
+        self._health_client: Optional[LLMClient] = None
+        # Guards _process and _health_client, since start() runs on a worker
+        # thread while the GUI thread keeps checking is_running(). Never held
+        # across network I/O
+        self._lock = threading.RLock()
     
     def find_server_binary(self) -> Optional[Path]:
         """Find the llama-server binary.
@@ -219,29 +351,44 @@ class LLMServerManager:
         3. PATH environment
         4. Legacy locations (~/llama.cpp/build/bin/)
         
+        The result is cached until the configured path changes or the
+        cached binary disappears.
+        
         Returns:
             Path to binary, or None if not found.
         """
+        configured = self.config.server_binary
+        if self._binary_cache and self._binary_cache[0] == configured:
+            cached = self._binary_cache[1]
+            if _is_executable(cached):
+                return cached
+        
+        binary = self._search_server_binary()
+        self._binary_cache = (configured, binary) if binary else None
+        return binary
+    
+    def _search_server_binary(self) -> Optional[Path]:
+        """Search the known locations for llama-server (uncached)."""
         binary_name = "llama-server" if os.name != "nt" else "llama-server.exe"
         
         # 1. Check configured path
         if self.config.server_binary:
-            path = Path(self.config.server_binary).expanduser()
-            if path.exists() and os.access(path, os.X_OK):
+            path = _expand_user(self.config.server_binary)
+            if _is_executable(path):
                 return path
         
         # 2. Check Automatr standard data directory (Linux/WSL)
         automatr_llama = (
-            Path.home() / ".local" / "share" / "automatr" / "llama.cpp" / "build" / "bin" / binary_name
+            _HOME / ".local" / "share" / "automatr" / "llama.cpp" / "build" / "bin" / binary_name
         )
-        if automatr_llama.exists() and os.access(automatr_llama, os.X_OK):
+        if _is_executable(automatr_llama):
             return automatr_llama
         
         # 2b. Check macOS data directory
         automatr_llama_macos = (
-            Path.home() / "Library" / "Application Support" / "automatr" / "llama.cpp" / "build" / "bin" / binary_name
+            _HOME / "Library" / "Application Support" / "automatr" / "llama.cpp" / "build" / "bin" / binary_name
         )
-        if automatr_llama_macos.exists() and os.access(automatr_llama_macos, os.X_OK):
+        if _is_executable(automatr_llama_macos):
             return automatr_llama_macos
         
         # 3. Check PATH
@@ -251,14 +398,14 @@ class LLMServerManager:
         
         # 4. Check legacy/common locations
         candidates = [
-            Path.home() / "llama.cpp" / "build" / "bin" / binary_name,
-            Path.home() / ".local" / "bin" / binary_name,
+            _HOME / "llama.cpp" / "build" / "bin" / binary_name,
+            _HOME / ".local" / "bin" / binary_name,
             Path("/usr/local/bin") / binary_name,
             Path("/opt/homebrew/bin") / binary_name,  # macOS Apple Silicon
         ]
         
         for path in candidates:
-            if path.exists() and os.access(path, os.X_OK):
+            if _is_executable(path):
                 return path
         
         return None
@@ -266,6 +413,8 @@ class LLMServerManager:
     def find_models(self, model_dir: Optional[str] = None) -> list[ModelInfo]:
         """Find available model files.
         
+        Results are cached while no directory in the tree has changed.
+        
         Args:
             model_dir: Directory to search. Uses config if None.
             
@@ -274,20 +423,33 @@ class LLMServerManager:
         """
         search_dir = model_dir or self.config.model_dir
         if not search_dir:
-            search_dir = str(Path.home() / "models")
+            search_dir = str(_HOME / "models")
+        
+        path = _expand_user(search_dir)
         
-        path = Path(search_dir).expanduser()
-        if not path.exists():
+        # Adding, removing or renaming a file or subdirectory bumps the
+        # mtime of its parent, so unchanged directories mean unchanged results
+        cached = self._models_cache
+        if cached and cached[0] == path and _mtimes_unchanged(cached[1]):
+            return list(cached[2])
+        
+        try:
+            models, dir_mtimes = _scan_models(path)
+        except OSError:
+            # Missing or unreadable model directory
             return []
         
-        models = []
-        for file in path.rglob("*.gguf"):
-            try:
-                models.append(ModelInfo.from_path(file))
-            except Exception:
-                continue
+        models.sort(key=lambda m: m.name.lower())
+        self._models_cache = (path, dir_mtimes, models)
+        return list(models)
+    
+    def clear_models_cache(self):
+        """Forget the cached find_models() result.
         
-        return sorted(models, key=lambda m: m.name.lower())
+        Call after writing into an existing model file (e.g. a finished
+        copy), which changes its size without touching directory mtimes.
+        """
+        self._models_cache = None
     
     def get_models_dir(self) -> Path:
         """Get the models directory path.
@@ -297,9 +459,9 @@ class LLMServerManager:
         """
         model_dir = self.config.model_dir
         if not model_dir:
-            model_dir = str(Path.home() / "models")
+            model_dir = str(_HOME / "models")
         
-        path = Path(model_dir).expanduser()
+        path = _expand_user(model_dir)
         path.mkdir(parents=True, exist_ok=True)
         return path
     
@@ -328,6 +490,7 @@ class LLMServerManager:
         
         try:
             shutil.copy2(source_path, dest_path)
+            self.clear_models_cache()
             return True, str(dest_path)
         except PermissionError:
             return False, f"Permission denied writing to:\n{dest_dir}"
@@ -340,16 +503,35 @@ class LLMServerManager:
         Returns:
             True if server is running, False otherwise.
         """
-        # Check our process handle
-        if self._process:
-            if self._process.poll() is None:
-                return True
-            self._process = None
-        
-        # Check by trying to connect
-        client = LLMClient(f"http://localhost:{self.config.server_port}")
+        with self._lock:
+            # Check our process handle
+            if self._process:
+                if self._process.poll() is None:
+                    return True
+                self._process = None
+            client = self._get_health_client()
+        
+        # Check by trying to connect (reusing the client's pooled connection).
+        # Done outside the lock so a slow health check never blocks the
+        # other thread
         return client.health_check()
     
+    def _server_ready(self) -> bool:
+        """Check whether the server answers, trying a bare TCP connect first."""
+        with self._lock:
+            client = self._get_health_client()
+        return client.port_open() and client.health_check()
+    
+    def _get_health_client(self) -> LLMClient:
+        """Get the client used for health checks on the configured port.
+        
+        Callers must hold self._lock.
+        """
+        base_url = f"http://localhost:{self.config.server_port}"
+        if self._health_client is None or self._health_client.base_url != base_url:
+            self._health_client = LLMClient(base_url)
+        return self._health_client
+    
     def start(self, model_path: Optional[str] = None) -> Tuple[bool, str]:
         """Start the llama-server.
         
@@ -383,7 +565,7 @@ class LLMServerManager:
                 "3. Set 'model_path' in ~/.config/automatr/config.json"
             )
         
-        model_file = Path(model).expanduser()
+        model_file = _expand_user(model)
         if not model_file.exists():
             return False, (
                 f"Model file not found:\n{model_file}\n\n"
@@ -403,25 +585,29 @@ class LLMServerManager:
         
         try:
             # Start process
-            self._process = subprocess.Popen(
+            process = subprocess.Popen(
                 cmd,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                start_new_session=True,
+                **_DETACH_KWARGS,
             )
+            with self._lock:
+                self._process = process
             
-            # Wait for server to be ready
-            for _ in range(60):  # 30 seconds timeout
-                time.sleep(0.5)
+            # Wait for server to be ready. Until the port opens, each poll is
+            # a bare TCP connect, so it can run far more often than an HTTP
+            # health check.
+            for _ in range(300):  # 30 seconds timeout
+                time.sleep(0.1)
                 
                 # Check if process died
-                if self._process.poll() is not None:
-                    _, stderr = self._process.communicate()
+                if process.poll() is not None:
+                    _, stderr = process.communicate()
                     error = stderr.decode() if stderr else "Unknown error"
                     return False, f"Server failed to start: {error[:200]}"
                 
                 # Check if responding
-                if self.is_running():
+                if self._server_ready():
                     return True, "Server started successfully"
             
             return True, "Server starting (may take a moment to be ready)"
@@ -438,13 +624,14 @@ class LLMServerManager:
         if not self.is_running():
             return True, "Server not running"
         
-        if self._process:
-            self._process.terminate()
+        with self._lock:
+            process, self._process = self._process, None
+        if process:
+            process.terminate()
             try:
-                self._process.wait(timeout=5)
+                process.wait(timeout=5)
             except subprocess.TimeoutExpired:
-                self._process.kill()
-            self._process = None
+                process.kill()
             return True, "Server stopped"
         
         # Try to find and kill by port or process name
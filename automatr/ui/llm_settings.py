@@ -30,7 +30,7 @@ class LLMSettingsDialog(QDialog):
         self.setWindowTitle("LLM Settings")
         self.setMinimumWidth(400)
         self._setup_ui()
-        self._load_settings()
+        self.load_from_config()
 
     def _setup_ui(self):
         layout = QVBoxLayout(self)
@@ -93,17 +93,24 @@ class LLMSettingsDialog(QDialog):
         buttons.rejected.connect(self.reject)
         layout.addWidget(buttons)
 
-    def _load_settings(self):
-        """Load current settings from config."""
+    def load_from_config(self):
+        """Load current settings from config.
+
+        Call before showing the dialog again to discard unsaved edits.
+        """
         config = get_config_manager().config.llm
         self.max_tokens_spin.setValue(config.max_tokens)
+        # Values as loaded, so Save can skip writing when nothing changed
+        self._initial = {"llm.max_tokens": config.max_tokens}
 
     def _reset_to_defaults(self):
         """Reset to default value."""
         self.max_tokens_spin.setValue(DEFAULT_MAX_TOKENS)
 
     def _save_settings(self):
-        """Save settings to config and close."""
-        config_manager = get_config_manager()
-        config_manager.update(**{"llm.max_tokens": self.max_tokens_spin.value()})
+        """Save changed settings to config in one write and close."""
+        current = {"llm.max_tokens": self.max_tokens_spin.value()}
+        changes = {k: v for k, v in current.items() if v != self._initial[k]}
+        if changes:
+            get_config_manager().update(**changes)
         self.accept()
@@ -1,13 +1,17 @@
 """Main window for Automatr GUI."""
 
 import base64
+import errno
+import os
+import queue
 import shutil
 import sys
+import threading
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterator, Optional
 
 from PyQt6.QtCore import Qt, QThread, pyqtSignal, QUrl, QByteArray, QTimer, QRect
-from PyQt6.QtGui import QAction, QKeySequence, QDesktopServices, QShortcut, QWheelEvent, QFont, QCloseEvent, QGuiApplication
+from PyQt6.QtGui import QAction, QKeySequence, QDesktopServices, QShortcut, QWheelEvent, QFont, QCloseEvent, QGuiApplication, QTextCursor
 from PyQt6.QtWidgets import (
     QApplication,
     QFileDialog,
@@ -33,7 +37,6 @@ from PyQt6.QtWidgets import (
     QFormLayout,
     QScrollArea,
     QFrame,
-    QTextEdit,
 )
 
 from automatr import __version__
@@ -54,7 +57,11 @@ class GenerationWorker(QThread):
     
     finished = pyqtSignal(str)
     error = pyqtSignal(str)
-    token_received = pyqtSignal(str)
+    # Emitted when streamed text is waiting in take_tokens(). No further
+    # signal is sent until it is taken, so a fast stream reaches the GUI
+    # thread in batches sized by how quickly the GUI gets to them, and the
+    # last token is never held back waiting for another
+    tokens_ready = pyqtSignal()
     # Emitted when waiting for server: (attempt, max_attempts)
     waiting_for_server = pyqtSignal(int, int)
     
@@ -67,11 +74,31 @@ class GenerationWorker(QThread):
         self.prompt = prompt
         self.stream = stream
         self._stopped = False
+        self._pending_tokens: list[str] = []
+        self._pending_lock = threading.Lock()
     
     def stop(self):
         """Request generation to stop."""
         self._stopped = True
     
+    def _queue_token(self, token: str):
+        """Buffer a streamed token, signalling the GUI if it was idle."""
+        with self._pending_lock:
+            notify = not self._pending_tokens
+            self._pending_tokens.append(token)
+        if notify:
+            self.tokens_ready.emit()
+    
+    def take_tokens(self) -> str:
+        """Return and clear the streamed text not yet shown.
+        
+        Called from the GUI thread in response to tokens_ready.
+        """
+        with self._pending_lock:
+            text = "".join(self._pending_tokens)
+            self._pending_tokens.clear()
+        return text
+    
     def _is_connection_error(self, error: Exception) -> bool:
         """Check if error is a connection issue (server not ready)."""
         error_str = str(error).lower()
@@ -98,7 +125,7 @@ class GenerationWorker(QThread):
                         if self._stopped:
                             break
                         result.append(token)
-                        self.token_received.emit(token)
+                        self._queue_token(token)
                     self.finished.emit("".join(result))
                 else:
                     result = client.generate(self.prompt)
@@ -124,6 +151,145 @@ class GenerationWorker(QThread):
             self.error.emit(str(last_error))
 
 
+class ServerStartWorker(QThread):
+    """Background worker that starts llama-server and waits for it to come up."""
+    
+    finished = pyqtSignal(bool, str)  # success, message
+    
+    def run(self):
+        success, message = get_llm_server().start()
+        self.finished.emit(success, message)
+
+
+class EspansoSyncWorker(QThread):
+    """Background worker that writes the Espanso match file."""
+    
+    finished = pyqtSignal(str, str)  # template action, error message ("" on success)
+    
+    def __init__(self, action: str):
+        super().__init__()
+        self.action = action
+    
+    def run(self):
+        try:
+            get_espanso_manager().sync()
+        except Exception as e:
+            self.finished.emit(self.action, str(e))
+            return
+        self.finished.emit(self.action, "")
+
+
+# Bytes requested per kernel copy call; progress is reported between calls
+_KERNEL_COPY_CHUNK = 64 * 1024 * 1024
+
+# Files smaller than this are copied in one shutil.copyfile() call
+_DIRECT_COPY_MAX = 128 * 1024 * 1024
+
+# errno values meaning "this fd pair can't be copied in-kernel", not a real failure
+_KERNEL_COPY_UNSUPPORTED = frozenset(
+    code for code in (
+        getattr(errno, name, None)
+        for name in ("EINVAL", "ENOSYS", "EXDEV", "EOPNOTSUPP", "ENOTSUP", "EBADF")
+    )
+    if code is not None
+)
+
+
+# fallocate() mode flag: reserve blocks without changing the file size
+_FALLOC_FL_KEEP_SIZE = 0x01
+
+
+def _preallocate(fd: int, size: int) -> None:
+    """Reserve disk space for a file about to be written, where supported.
+    
+    Calls Linux fallocate() directly rather than os.posix_fallocate(),
+    whose glibc fallback writes a byte per block on filesystems without
+    fallocate support (e.g. NFSv3). The file size is left alone, so a
+    short copy never leaves a padded file. Failures are ignored; this is
+    only a layout hint.
+    """
+    if size <= 0 or not sys.platform.startswith("linux"):
+        return
+    try:
+        import ctypes
+        fallocate = ctypes.CDLL(None, use_errno=True).fallocate64
+        fallocate.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int64, ctypes.c_int64]
+        fallocate(fd, _FALLOC_FL_KEEP_SIZE, 0, size)
+    except (OSError, AttributeError):
+        pass
+
+
+def _kernel_copiers() -> list:
+    """Return in-kernel copy functions available here, best first.
+    
+    Each takes (src_fd, dst_fd, count), copies from the current offset of
+    src_fd to the current offset of dst_fd, and returns the bytes copied.
+    """
+    copiers = []
+    if hasattr(os, "copy_file_range"):
+        # Can reflink/clone on btrfs, XFS and NFS
+        copiers.append(os.copy_file_range)
+    if hasattr(os, "sendfile") and sys.platform.startswith("linux"):
+        copiers.append(lambda src_fd, dst_fd, count: os.sendfile(dst_fd, src_fd, None, count))
+    return copiers
+
+
+def _pipelined_copy(src, dst, buffer_size: int = 8 * 1024 * 1024, buffers: int = 4) -> Iterator[int]:
+    """Copy src to dst with reads on a helper thread, yielding each write size.
+    
+    A reader thread fills a fixed ring of buffers while the calling thread
+    writes them out, so a slow source (e.g. USB) and the destination work
+    in parallel. Closing the generator early stops the reader.
+    
+    Args:
+        src: Unbuffered binary file to read from its current offset.
+        dst: Unbuffered binary file to write at its current offset.
+        buffer_size: Size of each buffer in the ring.
+        buffers: Number of buffers in the ring.
+    
+    Raises:
+        OSError: If reading or writing fails.
+    """
+    free: queue.Queue = queue.Queue()
+    full: queue.Queue = queue.Queue()
+    for _ in range(buffers):
+        free.put(bytearray(buffer_size))
+    stop = threading.Event()
+    
+    def reader():
+        try:
+            while not stop.is_set():
+                buf = free.get()
+                if buf is None:
+                    return
+                n = src.readinto(buf)
+                full.put((buf, n))
+                if not n:
+                    return
+        except BaseException as e:
+            full.put((None, e))
+    
+    thread = threading.Thread(target=reader, name="model-copy-reader", daemon=True)
+    thread.start()
+    try:
+        while True:
+            buf, n = full.get()
+            if buf is None:
+                raise n
+            if not n:
+                return
+            with memoryview(buf) as view:
+                written = 0
+                while written < n:
+                    written += dst.write(view[written:n])
+            free.put(buf)
+            yield n
+    finally:
+        stop.set()
+        free.put(None)  # Wake the reader if it is waiting for a buffer
+        thread.join()
+
+
 class ModelCopyWorker(QThread):
     """Background worker for copying model files with progress."""
     
@@ -140,32 +306,75 @@ class ModelCopyWorker(QThread):
         """Request cancellation of the copy operation."""
         self._canceled = True
     
+    def _copy_steps(self, src, dst, total_size: int) -> Iterator[int]:
+        """Copy src to dst, yielding the number of bytes copied by each step.
+        
+        Copies in the kernel (copy_file_range, then sendfile) where the
+        platform and filesystems allow it, then falls back to
+        _pipelined_copy from wherever the kernel copy stopped.
+        """
+        copiers = _kernel_copiers()
+        src_fd, dst_fd = src.fileno(), dst.fileno()
+        copied = 0
+        while copiers:
+            try:
+                n = copiers[0](src_fd, dst_fd, _KERNEL_COPY_CHUNK)
+            except OSError as e:
+                if e.errno not in _KERNEL_COPY_UNSUPPORTED:
+                    raise
+                copiers.pop(0)
+                continue
+            if n == 0:
+                if copied < total_size:
+                    # Some filesystems report 0 instead of failing
+                    copiers.pop(0)
+                    continue
+                return
+            copied += n
+            yield n
+        
+        yield from _pipelined_copy(src, dst)
+    
     def run(self):
         try:
             total_size = self.source.stat().st_size
             copied = 0
-            chunk_size = 1024 * 1024  # 1MB chunks
+            last_percent = -1
             
-            with open(self.source, "rb") as src:
-                with open(self.dest, "wb") as dst:
-                    while True:
-                        if self._canceled:
-                            dst.close()
-                            if self.dest.exists():
-                                self.dest.unlink()
-                            self.finished.emit(False, "Copy canceled")
-                            return
-                        
-                        chunk = src.read(chunk_size)
-                        if not chunk:
-                            break
-                        dst.write(chunk)
-                        copied += len(chunk)
-                        percent = int((copied / total_size) * 100)
-                        self.progress.emit(percent)
+            if total_size < _DIRECT_COPY_MAX:
+                # Too small to need progress steps; shutil picks the
+                # platform's native copy (sendfile, fcopyfile, CopyFile2)
+                shutil.copyfile(self.source, self.dest)
+                self.progress.emit(100)
+            else:
+                # Unbuffered files keep fd offsets in sync when switching
+                # from a kernel copy to the buffered fallback mid-file
+                with open(self.source, "rb", buffering=0) as src:
+                    with open(self.dest, "wb", buffering=0) as dst:
+                        # Contiguous blocks make llama.cpp's mmap loads faster
+                        _preallocate(dst.fileno(), total_size)
+                        steps = self._copy_steps(src, dst, total_size)
+                        try:
+                            for n in steps:
+                                if self._canceled:
+                                    break
+                                copied += n
+                                percent = int((copied / total_size) * 100)
+                                # Only signal the GUI thread when the bar would move
+                                if percent != last_percent:
+                                    last_percent = percent
+                                    self.progress.emit(percent)
+                        finally:
+                            steps.close()
+            
+            if self._canceled:
+                if self.dest.exists():
+                    self.dest.unlink()
+                self.finished.emit(False, "Copy canceled")
+                return
             
-            # Copy file metadata
-            shutil.copystat(self.source, self.dest)
+            # No copystat(): the new file keeps umask-default permissions and
+            # its own timestamps, which is what an imported model needs
             self.finished.emit(True, str(self.dest))
             
         except PermissionError:
@@ -179,9 +388,39 @@ class ModelCopyWorker(QThread):
             self.finished.emit(False, f"Failed to copy file: {e}")
 
 
+def _group_templates(manager) -> list[tuple[str, list[Template]]]:
+    """Read all templates and group them by folder for the template tree.
+    
+    Returns:
+        (folder, templates) pairs with templates sorted by name. Root
+        templates ("" folder) come first, then folders alphabetically,
+        including empty ones.
+    """
+    templates_by_folder = manager.list_by_folder()  # "" = root/uncategorized
+    # Each folder's list is already in name order, as returned by list_all()
+    return [(folder, templates_by_folder[folder]) for folder in sorted(templates_by_folder)]
+
+
+class TemplateScanWorker(QThread):
+    """Background worker that reads the templates directory."""
+    
+    result = pyqtSignal(list)  # _group_templates() output
+    
+    def run(self):
+        try:
+            groups = _group_templates(get_template_manager())
+        except Exception as e:
+            print(f"Error scanning templates: {e}")
+            groups = []
+        self.result.emit(groups)
+
+
 class VariableFormWidget(QScrollArea):
     """Widget for displaying and editing template variables."""
     
+    # Rough height of one label + input row, for sizing the first batch
+    ROW_HEIGHT_ESTIMATE = 40
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWidgetResizable(True)
@@ -195,60 +434,137 @@ class VariableFormWidget(QScrollArea):
         self.setWidget(self.container)
         
         self.inputs: dict[str, QWidget] = {}
+        # Bound text getter per input, so get_values needs no type checks
+        self._readers: dict[str, Callable[[], str]] = {}
         self.template: Optional[Template] = None
+        
+        # Hidden widgets from previous templates, reused by set_template
+        self._label_pool: list[QLabel] = []
+        self._line_pool: list[QLineEdit] = []
+        self._multi_pool: list[QPlainTextEdit] = []
+        self._empty_label: Optional[QLabel] = None
+        # Variables set_template has not built rows for yet
+        self._pending_vars: list = []
+    
+    def _release_rows(self):
+        """Take every row out of the form and return its widgets to the pools."""
+        while self.layout.rowCount():
+            row = self.layout.takeRow(0)
+            for item in (row.labelItem, row.fieldItem):
+                widget = item.widget() if item is not None else None
+                if widget is None:
+                    continue
+                widget.hide()
+                if widget is self._empty_label:
+                    continue
+                if isinstance(widget, QPlainTextEdit):
+                    self._multi_pool.append(widget)
+                elif isinstance(widget, QLineEdit):
+                    self._line_pool.append(widget)
+                elif isinstance(widget, QLabel):
+                    self._label_pool.append(widget)
     
     def set_template(self, template: Template):
-        """Set the template and create input fields for its variables."""
+        """Set the template and create input fields for its variables.
+        
+        Labels and inputs left over from the previous template are reused
+        rather than deleted and recreated. Only the rows that fit in the
+        viewport are built straight away; the rest follow on the next
+        event-loop pass, so the form appears before long templates finish.
+        """
         self.template = template
         self.inputs.clear()
+        self._readers.clear()
+        self._pending_vars = []
         
-        # Clear existing widgets
-        while self.layout.count():
-            item = self.layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-        
-        if not template.variables:
-            label = QLabel("No variables in this template.")
-            label.setStyleSheet("color: #808080; font-style: italic;")
-            label.setWordWrap(True)
-            self.layout.addRow(label)
+        # One relayout/repaint for the whole rebuild
+        self.container.setUpdatesEnabled(False)
+        try:
+            self._release_rows()
+            
+            if not template.variables:
+                if self._empty_label is None:
+                    self._empty_label = QLabel("No variables in this template.")
+                    self._empty_label.setStyleSheet("color: #808080; font-style: italic;")
+                    self._empty_label.setWordWrap(True)
+                self.layout.addRow(self._empty_label)
+                self._empty_label.show()
+                return
+            
+            visible_rows = max(1, self.viewport().height() // self.ROW_HEIGHT_ESTIMATE)
+            for var in template.variables[:visible_rows]:
+                self._add_variable_row(var)
+            self._pending_vars = list(template.variables[visible_rows:])
+            self._update_tab_order()
+        finally:
+            self.container.setUpdatesEnabled(True)
+        
+        if self._pending_vars:
+            QTimer.singleShot(0, self._build_pending_rows)
+    
+    def _build_pending_rows(self):
+        """Build the rows set_template deferred, if any are still pending."""
+        if not self._pending_vars:
             return
+        pending, self._pending_vars = self._pending_vars, []
+        self.container.setUpdatesEnabled(False)
+        try:
+            for var in pending:
+                self._add_variable_row(var)
+            self._update_tab_order()
+        finally:
+            self.container.setUpdatesEnabled(True)
+    
+    def _update_tab_order(self):
+        """Chain the inputs' focus order to match the rows.
         
-        for var in template.variables:
-            # Create label with word wrap
+        Pooled widgets keep the focus position they were created at, so
+        without this Tab would follow creation order, not the form.
+        """
+        inputs = list(self.inputs.values())
+        for first, second in zip(inputs, inputs[1:]):
+            QWidget.setTabOrder(first, second)
+    
+    def _add_variable_row(self, var):
+        """Add a label and input row for one variable, reusing pooled widgets."""
+        # Create label with word wrap
+        if self._label_pool:
+            label = self._label_pool.pop()
+            label.setText(f"{var.label}:")
+        else:
             label = QLabel(f"{var.label}:")
             label.setWordWrap(True)
-
-            default_value = var.default if isinstance(var.default, str) else str(var.default) if var.default is not None else ""
-            
-            if var.multiline:
+        
+        default_value = var.default if isinstance(var.default, str) else str(var.default) if var.default is not None else ""
+        
+        if var.multiline:
+            if self._multi_pool:
+                widget = self._multi_pool.pop()
+            else:
                 widget = QPlainTextEdit()
-                widget.setPlaceholderText(default_value or f"Enter {var.label.lower()}...")
                 widget.setMaximumHeight(100)
-                if default_value:
-                    widget.setPlainText(default_value)
-            else:
-                widget = QLineEdit()
-                widget.setPlaceholderText(default_value or f"Enter {var.label.lower()}...")
-                if default_value:
-                    widget.setText(default_value)
-            
-            self.inputs[var.name] = widget
-            self.layout.addRow(label, widget)
+            widget.setPlaceholderText(default_value or f"Enter {var.label.lower()}...")
+            widget.setPlainText(default_value)
+            self._readers[var.name] = widget.toPlainText
+        else:
+            widget = self._line_pool.pop() if self._line_pool else QLineEdit()
+            widget.setPlaceholderText(default_value or f"Enter {var.label.lower()}...")
+            widget.setText(default_value)
+            self._readers[var.name] = widget.text
+        
+        self.inputs[var.name] = widget
+        self.layout.addRow(label, widget)
+        label.show()
+        widget.show()
     
     def get_values(self) -> dict[str, str]:
         """Get the current values from all input fields."""
-        values = {}
-        for name, widget in self.inputs.items():
-            if isinstance(widget, QPlainTextEdit):
-                values[name] = widget.toPlainText()
-            else:
-                values[name] = widget.text()
-        return values
+        self._build_pending_rows()
+        return {name: read() for name, read in self._readers.items()}
     
     def clear(self):
         """Clear all input fields."""
+        self._build_pending_rows()
         for widget in self.inputs.values():
             if isinstance(widget, QPlainTextEdit):
                 widget.clear()
@@ -274,11 +590,46 @@ class MainWindow(QMainWindow):
         self._last_prompt: Optional[str] = None
         self._last_output: Optional[str] = None
         
+        # Espanso auto-sync is debounced so a burst of saves writes once
+        self._espanso_sync_action = ""
+        self._espanso_sync_timer = QTimer(self)
+        self._espanso_sync_timer.setSingleShot(True)
+        self._espanso_sync_timer.setInterval(500)
+        self._espanso_sync_timer.timeout.connect(self._run_espanso_auto_sync)
+        self._espanso_sync_worker: Optional[EspansoSyncWorker] = None
+        
+        # Models the model submenu was last built for, and their actions
+        self._model_menu_models: Optional[list] = None
+        self._model_actions: list[QAction] = []
+        self._model_by_path: dict = {}
+        
+        # Font size changes are applied once a burst of Ctrl+wheel steps ends
+        self._font_apply_timer = QTimer(self)
+        self._font_apply_timer.setSingleShot(True)
+        self._font_apply_timer.setInterval(80)
+        self._font_apply_timer.timeout.connect(self._flush_font_size)
+        
         self._setup_menu_bar()
         self._setup_ui()
         self._setup_status_bar()
         self._setup_shortcuts()
-        self._load_templates()
+        self._scan_worker: Optional[TemplateScanWorker] = None
+        # Times the tree has been filled, and the count when the scan began
+        self._tree_populations = 0
+        self._scan_populations = 0
+        self._server_start_worker: Optional[ServerStartWorker] = None
+        self._server_start_shows_dialog = False
+        self._server_start_then: Optional[Callable[[], None]] = None  # Run once started
+        self._llm_status_shown: Optional[bool] = None  # Last state _apply_llm_status drew
+        # Template tree bookkeeping, kept by _rebuild_template_tree
+        self._tree_layout: Optional[tuple] = None  # (folder, names) groups last built
+        self._folder_items: dict[str, QTreeWidgetItem] = {}
+        self._template_item_list: list[QTreeWidgetItem] = []  # In build order
+        self._template_items: dict[str, QTreeWidgetItem] = {}  # By template name
+        # Dialogs created on first use and reused afterwards
+        self._llm_settings_dialog: Optional[LLMSettingsDialog] = None
+        self._template_editor: Optional[TemplateEditor] = None
+        self._load_templates_async()
         self._restore_state()
         self._check_llm_status()
     
@@ -382,28 +733,42 @@ class MainWindow(QMainWindow):
             super().wheelEvent(event)
     
     def _apply_font_size(self, size: int):
-        """Apply a new font size to the application."""
+        """Apply a new font size to the application.
+        
+        The size is recorded immediately, but saving and restyling are
+        deferred briefly so a burst of changes (e.g. Ctrl+wheel) is
+        applied once.
+        """
         # Clamp to reasonable bounds
         size = max(8, min(24, size))
         
+        get_config().ui.font_size = size
+        self._font_apply_timer.start()
+    
+    def _flush_font_size(self):
+        """Save the pending font size and restyle the application with it."""
         config = get_config()
-        config.ui.font_size = size
+        size = config.ui.font_size
         save_config(config)
         
         # Apply new stylesheet
         stylesheet = get_theme_stylesheet(config.ui.theme, size)
         app = QApplication.instance()
         if app:
-            app.setStyleSheet(stylesheet)
+            # setStyleSheet re-polishes every widget, even for an identical
+            # string, so skip it when the size ended where it started
+            if stylesheet != app.styleSheet():
+                app.setStyleSheet(stylesheet)
             # Keep widget fonts in sync with the base size to avoid mixed font scaling
-            base_font = QFont(app.font().family(), size)
-            app.setFont(base_font)
+            if app.font().pointSize() != size:
+                base_font = QFont(app.font().family(), size)
+                app.setFont(base_font)
         
         # Update section labels (they have hardcoded sizes)
         label_size = size + 1
         label_style = f"font-weight: bold; font-size: {label_size}pt;"
-        for label in self.findChildren(QLabel):
-            if label.text() in ("Templates", "Variables", "Output"):
+        for label in self._section_labels:
+            if label.styleSheet() != label_style:
                 label.setStyleSheet(label_style)
         
         self.status_bar.showMessage(f"Font size: {size}pt", 2000)
@@ -445,17 +810,54 @@ class MainWindow(QMainWindow):
             self.status_bar.showMessage("Server already running", 3000)
             return
         
+        self._begin_server_start(show_error_dialog=True)
+    
+    def _begin_server_start(
+        self, show_error_dialog: bool, on_started: Optional[Callable[[], None]] = None
+    ):
+        """Start the LLM server on a worker thread.
+        
+        The start buttons are disabled until _on_server_start_finished runs.
+        
+        Args:
+            show_error_dialog: Report a failure in a message box rather
+                than the status bar.
+            on_started: Called on the GUI thread once the server is up,
+                to continue the action that needed it. Replaces the
+                callback of a start already in progress.
+        """
+        if self._server_start_worker is not None and self._server_start_worker.isRunning():
+            if on_started is not None:
+                self._server_start_then = on_started
+                self._server_start_shows_dialog = True
+            return
+        
         self.status_bar.showMessage("Starting server...", 0)
-        QApplication.processEvents()
+        self.start_server_action.setEnabled(False)
+        self.server_btn.setEnabled(False)
         
-        success, message = server.start()
+        self._server_start_shows_dialog = show_error_dialog
+        self._server_start_then = on_started
+        self._server_start_worker = ServerStartWorker()
+        self._server_start_worker.finished.connect(self._on_server_start_finished)
+        self._server_start_worker.start()
+    
+    def _on_server_start_finished(self, success: bool, message: str):
+        """Report the result of a background server start."""
+        self.server_btn.setEnabled(True)
+        on_started, self._server_start_then = self._server_start_then, None
         
         if success:
             self.status_bar.showMessage("Server started", 3000)
-        else:
+        elif self._server_start_shows_dialog:
             QMessageBox.critical(self, "Server Error", message)
+        else:
+            self.status_bar.showMessage(f"Failed to start server: {message}", 5000)
         
         self._check_llm_status()
+        
+        if success and on_started is not None:
+            on_started()
     
     def _stop_server(self):
         """Stop the LLM server."""
@@ -470,44 +872,63 @@ class MainWindow(QMainWindow):
         self._check_llm_status()
     
     def _populate_model_menu(self):
-        """Populate the model selector submenu with discovered models."""
-        self.model_menu.clear()
+        """Populate the model selector submenu with discovered models.
         
+        The submenu is only rebuilt when the model list changed since it
+        was last shown; otherwise just the check mark is updated.
+        """
         server = get_llm_server()
         models = server.find_models()
+        current_model = get_config().llm.model_path
+        
+        if models == self._model_menu_models:
+            for action in self._model_actions:
+                action.setChecked(action.data() == current_model)
+            return
+        
+        # Actions are owned by the menu, so clear() deletes them
+        self.model_menu.clear()
+        self._model_menu_models = models
+        self._model_actions = []
+        self._model_by_path = {str(model.path): model for model in models}
         
         if not models:
-            no_models = QAction("No models found", self)
+            no_models = QAction("No models found", self.model_menu)
             no_models.setEnabled(False)
             self.model_menu.addAction(no_models)
             
-            hint = QAction("Place .gguf files in ~/models/", self)
+            hint = QAction("Place .gguf files in ~/models/", self.model_menu)
             hint.setEnabled(False)
             self.model_menu.addAction(hint)
             
             self.model_menu.addSeparator()
-            add_action = QAction("Add Model from File...", self)
+            add_action = QAction("Add Model from File...", self.model_menu)
             add_action.triggered.connect(self._add_model_from_file)
             self.model_menu.addAction(add_action)
             return
         
-        config = get_config()
-        current_model = config.llm.model_path
-        
         for model in models:
-            action = QAction(f"{model.name} ({model.size_gb:.1f} GB)", self)
+            action = QAction(f"{model.name} ({model.size_gb:.1f} GB)", self.model_menu)
             action.setCheckable(True)
             action.setChecked(str(model.path) == current_model)
             action.setData(str(model.path))
-            action.triggered.connect(lambda checked, m=model: self._select_model(m))
+            action.triggered.connect(self._on_model_action_triggered)
             self.model_menu.addAction(action)
+            self._model_actions.append(action)
         
         # Always show Add Model option at the bottom
         self.model_menu.addSeparator()
-        add_action = QAction("Add Model from File...", self)
+        add_action = QAction("Add Model from File...", self.model_menu)
         add_action.triggered.connect(self._add_model_from_file)
         self.model_menu.addAction(add_action)
     
+    def _on_model_action_triggered(self, checked: bool = False):
+        """Select the model whose submenu action was triggered."""
+        action = self.sender()
+        model = self._model_by_path.get(action.data()) if action else None
+        if model is not None:
+            self._select_model(model)
+    
     def _select_model(self, model):
         """Select a model and update configuration."""
         from automatr.core.config import get_config_manager
@@ -549,17 +970,7 @@ class MainWindow(QMainWindow):
         if server.is_running():
             self._launch_web_server()
         else:
-            self.status_bar.showMessage("Starting server...", 0)
-            QApplication.processEvents()
-            
-            success, message = server.start()
-            
-            if success:
-                self.status_bar.showMessage("Server started", 3000)
-            else:
-                self.status_bar.showMessage(f"Failed to start server: {message}", 5000)
-            
-            self._check_llm_status()
+            self._begin_server_start(show_error_dialog=False)
 
     def _add_model_from_file(self):
         """Add a model from a local GGUF file."""
@@ -626,6 +1037,7 @@ class MainWindow(QMainWindow):
     def _on_model_copy_finished(self, success: bool, message: str):
         """Handle model copy completion."""
         self.progress_dialog.close()
+        get_llm_server().clear_models_cache()
         
         if success:
             # Auto-select the new model
@@ -768,6 +1180,8 @@ class MainWindow(QMainWindow):
         right_label = QLabel("Output")
         right_label.setStyleSheet(f"font-weight: bold; font-size: {label_size}pt;")
         right_header.addWidget(right_label)
+        # Section headers restyled by _flush_font_size
+        self._section_labels = (left_label, middle_label, right_label)
         right_header.addStretch()
         
         self.copy_btn = QPushButton("Copy")
@@ -800,7 +1214,7 @@ class MainWindow(QMainWindow):
         
         right_layout.addLayout(right_header)
         
-        self.output_text = QTextEdit()
+        self.output_text = QPlainTextEdit()
         self.output_text.setReadOnly(True)
         self.output_text.setPlaceholderText(
             "Generated output will appear here.\n\n"
@@ -895,6 +1309,10 @@ class MainWindow(QMainWindow):
         # Only restore maximized state if geometry was valid
         if geometry_valid and config.ui.window_maximized:
             self.setWindowState(Qt.WindowState.WindowMaximized)
+    
+    def _restore_tree_state(self):
+        """Restore expanded folders and the last selected template."""
+        config = get_config()
         
         # Restore expanded folders in template tree
         if config.ui.expanded_folders:
@@ -912,6 +1330,11 @@ class MainWindow(QMainWindow):
         """Save window and app state when closing."""
         config = get_config()
         
+        # A QThread must not be destroyed while still running
+        for worker in (self._server_start_worker, self._espanso_sync_worker):
+            if worker is not None:
+                worker.wait()
+        
         # Save window geometry (handles position and size)
         geometry_bytes = bytes(self.saveGeometry())
         config.ui.window_geometry = base64.b64encode(geometry_bytes).decode('ascii')
@@ -931,70 +1354,137 @@ class MainWindow(QMainWindow):
         if self.current_template:
             config.ui.last_template = self.current_template.name
         
-        # Save expanded folders
-        expanded = []
-        for i in range(self.template_tree.topLevelItemCount()):
-            item = self.template_tree.topLevelItem(i)
-            data = item.data(0, Qt.ItemDataRole.UserRole)
-            if data and data[0] == "folder" and item.isExpanded():
-                expanded.append(data[1])
-        config.ui.expanded_folders = expanded
+        if self._scan_worker is not None:
+            self._scan_worker.wait()
+        
+        # Save expanded folders, unless the tree was never filled because
+        # the startup scan had not finished
+        if self._tree_layout is not None:
+            expanded = []
+            for i in range(self.template_tree.topLevelItemCount()):
+                item = self.template_tree.topLevelItem(i)
+                data = item.data(0, Qt.ItemDataRole.UserRole)
+                if data and data[0] == "folder" and item.isExpanded():
+                    expanded.append(data[1])
+            config.ui.expanded_folders = expanded
         
         save_config(config)
         event.accept()
     
     def _load_templates(self):
         """Load templates from disk, grouped by folder."""
-        self.template_tree.clear()
-        manager = get_template_manager()
-        
-        # Get all templates and organize by folder
-        templates_by_folder: dict[str, list[Template]] = {"": []}  # "" = root/uncategorized
-        
-        for folder in manager.list_folders():
-            templates_by_folder[folder] = []
+        self._populate_template_tree(_group_templates(get_template_manager()))
+    
+    def _load_templates_async(self):
+        """Load templates on a worker thread, then fill the tree.
         
-        for template in manager.list_all():
-            folder = manager.get_template_folder(template)
-            if folder not in templates_by_folder:
-                templates_by_folder[folder] = []
-            templates_by_folder[folder].append(template)
+        Used at startup so the window can paint before the templates
+        directory has been read; tree-dependent state is restored once the
+        result arrives.
+        """
+        self._scan_populations = self._tree_populations
+        self._scan_worker = TemplateScanWorker()
+        self._scan_worker.result.connect(self._on_templates_scanned)
+        # Keep the worker referenced until its thread has really exited
+        self._scan_worker.finished.connect(self._on_scan_worker_finished)
+        self._scan_worker.start()
+    
+    def _on_templates_scanned(self, groups: list):
+        """Fill the tree from a startup scan and restore its saved state."""
+        if self._tree_populations != self._scan_populations:
+            # A synchronous reload already filled the tree with newer data
+            return
+        self._populate_template_tree(groups)
+        self._restore_tree_state()
+    
+    def _on_scan_worker_finished(self):
+        """Release the startup scan worker once its thread has ended."""
+        if self._scan_worker is not None:
+            self._scan_worker.wait()
+            self._scan_worker = None
+    
+    def _populate_template_tree(self, groups: list[tuple[str, list[Template]]]):
+        """Show the given folder groups in the template tree.
+        
+        When the folders and template names are unchanged (e.g. after a
+        template's content was edited) the existing items are updated in
+        place. Otherwise the tree is rebuilt, keeping expanded folders and
+        the scroll position.
+        """
+        self._tree_populations += 1
+        layout = tuple((folder, tuple(t.name for t in templates)) for folder, templates in groups)
+        templates = [t for _, folder_templates in groups for t in folder_templates]
+        
+        if layout == self._tree_layout:
+            # Items were built in this same order, so pair them up directly
+            for item, template in zip(self._template_item_list, templates):
+                item.setData(0, Qt.ItemDataRole.UserRole, ("template", template))
+                item.setToolTip(0, template.description or "")
+        else:
+            self._rebuild_template_tree(groups)
+            self._tree_layout = layout
         
-        total_count = 0
+        self.status_bar.showMessage(f"Loaded {len(templates)} templates", 3000)
+    
+    def _rebuild_template_tree(self, groups: list[tuple[str, list[Template]]]):
+        """Replace the template tree items, keeping expanded folders and scroll."""
+        expanded = {folder for folder, item in self._folder_items.items() if item.isExpanded()}
+        scroll_bar = self.template_tree.verticalScrollBar()
+        scroll = scroll_bar.value()
         
-        # Add uncategorized templates first (root level)
-        for template in sorted(templates_by_folder.get("", []), key=lambda t: t.name.lower()):
-            item = QTreeWidgetItem([template.name])
-            item.setData(0, Qt.ItemDataRole.UserRole, ("template", template))
-            if template.description:
-                item.setToolTip(0, template.description)
-            self.template_tree.addTopLevelItem(item)
-            total_count += 1
+        items = []
+        item_list: list[QTreeWidgetItem] = []
+        folder_items: dict[str, QTreeWidgetItem] = {}
+        # First item per name wins, matching a top-down search of the tree
+        template_items: dict[str, QTreeWidgetItem] = {}
         
-        # Add folders with their templates
-        for folder in sorted(templates_by_folder.keys()):
+        for folder, folder_templates in groups:
             if folder == "":
-                continue  # Already handled uncategorized
+                # Uncategorized templates go at the root level
+                for template in folder_templates:
+                    item = QTreeWidgetItem([template.name])
+                    item.setData(0, Qt.ItemDataRole.UserRole, ("template", template))
+                    if template.description:
+                        item.setToolTip(0, template.description)
+                    items.append(item)
+                    item_list.append(item)
+                    template_items.setdefault(template.name, item)
+                continue
             
             folder_item = QTreeWidgetItem([f"📁 {folder}"])
             folder_item.setData(0, Qt.ItemDataRole.UserRole, ("folder", folder))
             folder_item.setExpanded(True)
             
-            folder_templates = templates_by_folder[folder]
             if not folder_templates:
                 folder_item.setToolTip(0, "Empty folder")
             
-            for template in sorted(folder_templates, key=lambda t: t.name.lower()):
+            for template in folder_templates:
                 child = QTreeWidgetItem([template.name])
                 child.setData(0, Qt.ItemDataRole.UserRole, ("template", template))
                 if template.description:
                     child.setToolTip(0, template.description)
                 folder_item.addChild(child)
-                total_count += 1
+                item_list.append(child)
+                template_items.setdefault(template.name, child)
             
-            self.template_tree.addTopLevelItem(folder_item)
+            items.append(folder_item)
+            folder_items[folder] = folder_item
         
-        self.status_bar.showMessage(f"Loaded {total_count} templates", 3000)
+        # Swap the contents in one batch with a single repaint
+        self.template_tree.setUpdatesEnabled(False)
+        try:
+            self.template_tree.clear()
+            self.template_tree.addTopLevelItems(items)
+            for folder in expanded:
+                if folder in folder_items:
+                    folder_items[folder].setExpanded(True)
+            scroll_bar.setValue(scroll)
+        finally:
+            self.template_tree.setUpdatesEnabled(True)
+        
+        self._folder_items = folder_items
+        self._template_item_list = item_list
+        self._template_items = template_items
     
     def _refresh_templates(self):
         """Refresh the template list (alias for _load_templates)."""
@@ -1105,8 +1595,24 @@ class MainWindow(QMainWindow):
     
     def _check_llm_status(self):
         """Check if the LLM server is running and update UI."""
-        server = get_llm_server()
-        is_running = server.is_running()
+        self._apply_llm_status(get_llm_server().is_running())
+    
+    def _apply_llm_status(self, is_running: bool):
+        """Update the LLM status widgets for the given server state.
+        
+        The label and buttons are only restyled when the state changes;
+        each setStyleSheet() call repolishes its widget, so repeated checks
+        with an unchanged result (e.g. after every generation error) leave
+        them alone.
+        """
+        # Menu actions are cheap to set and may have been disabled while
+        # a server start was in flight
+        self.start_server_action.setEnabled(not is_running)
+        self.stop_server_action.setEnabled(is_running)
+        
+        if is_running == self._llm_status_shown:
+            return
+        self._llm_status_shown = is_running
         
         if is_running:
             self.llm_status_label.setText("LLM: Connected")
@@ -1122,15 +1628,14 @@ class MainWindow(QMainWindow):
             self.server_btn.setStyleSheet("")
             self.stop_server_btn.setEnabled(False)
             self.stop_server_btn.setStyleSheet("")
-        
-        # Update menu actions
-        self.start_server_action.setEnabled(not is_running)
-        self.stop_server_action.setEnabled(is_running)
     
     def _show_llm_settings(self):
         """Show the LLM settings dialog."""
-        dialog = LLMSettingsDialog(self)
-        dialog.exec()
+        if self._llm_settings_dialog is None:
+            self._llm_settings_dialog = LLMSettingsDialog(self)
+        else:
+            self._llm_settings_dialog.load_from_config()
+        self._llm_settings_dialog.exec()
     
     def _edit_generate_instructions(self):
         """Edit the AI instructions for template generation."""
@@ -1156,12 +1661,23 @@ class MainWindow(QMainWindow):
             dialog = ImprovementPromptEditor(self)
             dialog.exec()
     
+    def _open_template_editor(self, template: Optional[Template] = None, last_folder: str = "") -> TemplateEditor:
+        """Load the shared template editor and run it modally.
+        
+        The editor is created on first use and reset with load() afterwards.
+        """
+        if self._template_editor is None:
+            self._template_editor = TemplateEditor(template, parent=self, last_folder=last_folder)
+            self._template_editor.template_saved.connect(self._on_template_saved)
+        else:
+            self._template_editor.load(template, last_folder)
+        self._template_editor.exec()
+        return self._template_editor
+    
     def _new_template(self):
         """Create a new template."""
         config = get_config()
-        dialog = TemplateEditor(parent=self, last_folder=config.ui.last_editor_folder)
-        dialog.template_saved.connect(self._on_template_saved)
-        dialog.exec()
+        dialog = self._open_template_editor(last_folder=config.ui.last_editor_folder)
         # Save the last used folder
         config.ui.last_editor_folder = dialog.folder_combo.currentData() or ""
         save_config(config)
@@ -1171,9 +1687,7 @@ class MainWindow(QMainWindow):
         if not self.current_template:
             return
         
-        dialog = TemplateEditor(self.current_template, parent=self)
-        dialog.template_saved.connect(self._on_template_saved)
-        dialog.exec()
+        self._open_template_editor(self.current_template)
     
     def _improve_template(self):
         """Improve the selected template using AI based on user feedback.
@@ -1194,6 +1708,9 @@ class MainWindow(QMainWindow):
         if not ok:
             return  # User cancelled
         
+        template = self.current_template
+        feedback = feedback.strip() if feedback else ""
+        
         # Check LLM status
         server = get_llm_server()
         if not server.is_running():
@@ -1205,18 +1722,20 @@ class MainWindow(QMainWindow):
             )
             
             if reply == QMessageBox.StandardButton.Yes:
-                success, message = server.start()
-                if not success:
-                    QMessageBox.critical(self, "Error", message)
-                    return
-                self._check_llm_status()
-            else:
-                return
+                # Continue once the model has loaded, without blocking the window
+                self._begin_server_start(
+                    show_error_dialog=True,
+                    on_started=lambda: self._show_improve_dialog(template, feedback),
+                )
+            return
         
-        # Show improvement dialog with feedback
+        self._show_improve_dialog(template, feedback)
+    
+    def _show_improve_dialog(self, template: Template, feedback: str):
+        """Show the improvement dialog for a template with initial feedback."""
         dialog = TemplateImproveDialog(
-            self.current_template, 
-            initial_feedback=feedback.strip() if feedback else "",
+            template, 
+            initial_feedback=feedback,
             parent=self
         )
         dialog.changes_applied.connect(self._on_improvement_applied)
@@ -1353,20 +1872,7 @@ class MainWindow(QMainWindow):
                 # Auto-sync Espanso if enabled and template had a trigger
                 config = get_config()
                 if had_trigger and config.espanso.enabled and config.espanso.auto_sync:
-                    espanso = get_espanso_manager()
-                    if espanso.is_available():
-                        try:
-                            espanso.sync()
-                            self.status_bar.showMessage("Template deleted and Espanso synced", 3000)
-                        except Exception as e:
-                            QMessageBox.warning(
-                                self,
-                                "Espanso Sync Failed",
-                                f"Template deleted, but Espanso sync failed:\n{e}",
-                            )
-                            self.status_bar.showMessage("Template deleted (Espanso sync failed)", 3000)
-                    else:
-                        self.status_bar.showMessage("Template deleted", 3000)
+                    self._schedule_espanso_auto_sync("deleted")
                 else:
                     self.status_bar.showMessage("Template deleted", 3000)
             else:
@@ -1385,35 +1891,54 @@ class MainWindow(QMainWindow):
         # Auto-sync Espanso if enabled and template has a trigger
         config = get_config()
         if template.trigger and config.espanso.enabled and config.espanso.auto_sync:
-            espanso = get_espanso_manager()
-            if espanso.is_available():
-                try:
-                    espanso.sync()
-                    self.status_bar.showMessage(f"Template saved and Espanso synced", 3000)
-                except Exception as e:
-                    QMessageBox.warning(
-                        self,
-                        "Espanso Sync Failed",
-                        f"Template saved, but Espanso sync failed:\n{e}",
-                    )
-                    self.status_bar.showMessage("Template saved (Espanso sync failed)", 3000)
+            self._schedule_espanso_auto_sync("saved")
+    
+    def _schedule_espanso_auto_sync(self, action: str):
+        """Sync to Espanso shortly, coalescing rapid saves/deletes into one sync.
+        
+        Args:
+            action: What happened to the template ("saved" or "deleted"),
+                used in the status message.
+        """
+        self._espanso_sync_action = action
+        # Restarting the single-shot timer drops any pending sync
+        self._espanso_sync_timer.start()
+    
+    def _run_espanso_auto_sync(self):
+        """Start the debounced Espanso sync on a worker thread."""
+        action = self._espanso_sync_action
+        if not get_espanso_manager().is_available():
+            self.status_bar.showMessage(f"Template {action}", 3000)
+            return
+        
+        if self._espanso_sync_worker is not None and self._espanso_sync_worker.isRunning():
+            # Let the running sync finish, then sync again with the newer state
+            self._espanso_sync_timer.start()
+            return
+        
+        self._espanso_sync_worker = EspansoSyncWorker(action)
+        self._espanso_sync_worker.finished.connect(self._on_espanso_sync_finished)
+        self._espanso_sync_worker.start()
+    
+    def _on_espanso_sync_finished(self, action: str, error: str):
+        """Report the result of a background Espanso sync."""
+        if not error:
+            self.status_bar.showMessage(f"Template {action} and Espanso synced", 3000)
+            return
+        
+        QMessageBox.warning(
+            self,
+            "Espanso Sync Failed",
+            f"Template {action}, but Espanso sync failed:\n{error}",
+        )
+        self.status_bar.showMessage(f"Template {action} (Espanso sync failed)", 3000)
     
     def _select_template_in_tree(self, template_name: str):
         """Select a template in the tree by name."""
-        def find_in_item(item: QTreeWidgetItem) -> bool:
-            data = item.data(0, Qt.ItemDataRole.UserRole)
-            if data and data[0] == "template" and data[1].name == template_name:
-                self.template_tree.setCurrentItem(item)
-                self._on_tree_item_clicked(item, 0)
-                return True
-            for i in range(item.childCount()):
-                if find_in_item(item.child(i)):
-                    return True
-            return False
-        
-        for i in range(self.template_tree.topLevelItemCount()):
-            if find_in_item(self.template_tree.topLevelItem(i)):
-                break
+        item = self._template_items.get(template_name)
+        if item is not None:
+            self.template_tree.setCurrentItem(item)
+            self._on_tree_item_clicked(item, 0)
     
     def _delete_folder(self, folder_name: str):
         """Delete a template folder."""
@@ -1452,13 +1977,20 @@ class MainWindow(QMainWindow):
             )
             
             if reply == QMessageBox.StandardButton.Yes:
-                success, message = server.start()
-                if not success:
-                    QMessageBox.critical(self, "Error", message)
-                    return
-                self._check_llm_status()
-            else:
-                return
+                # Continue once the model has loaded, without blocking the window
+                self._begin_server_start(
+                    show_error_dialog=True,
+                    on_started=lambda: self._start_generation(prompt),
+                )
+            return
+        
+        self._start_generation(prompt)
+    
+    def _start_generation(self, prompt: str):
+        """Stream a generation for an already rendered prompt."""
+        if self.worker is not None and self.worker.isRunning():
+            # A generation started while the server was still loading
+            return
         
         # Disable generate button during generation
         self.generate_btn.setEnabled(False)
@@ -1478,7 +2010,7 @@ class MainWindow(QMainWindow):
         
         # Start generation in background
         self.worker = GenerationWorker(prompt, stream=True)
-        self.worker.token_received.connect(self._on_token_received)
+        self.worker.tokens_ready.connect(self._on_tokens_ready)
         self.worker.finished.connect(self._on_generation_finished)
         self.worker.error.connect(self._on_generation_error)
         self.worker.waiting_for_server.connect(self._on_waiting_for_server)
@@ -1500,16 +2032,20 @@ class MainWindow(QMainWindow):
         QApplication.clipboard().setText(rendered)
         self.status_bar.showMessage("Template copied to clipboard", 3000)
     
-    def _on_token_received(self, token: str):
-        """Handle streaming token."""
+    def _on_tokens_ready(self):
+        """Append the streamed text waiting in the generation worker."""
+        worker = self.sender()
+        if not isinstance(worker, GenerationWorker):
+            return
+        text = worker.take_tokens()
+        if not text:
+            return
         # Clear waiting state on first token
         if getattr(self, '_waiting_for_server', False):
             self._waiting_for_server = False
             self.generating_label.setText("Generating...")
-        cursor = self.output_text.textCursor()
-        cursor.movePosition(cursor.MoveOperation.End)
-        cursor.insertText(token)
-        self.output_text.setTextCursor(cursor)
+        self.output_text.moveCursor(QTextCursor.MoveOperation.End)
+        self.output_text.insertPlainText(text)
         self.output_text.ensureCursorVisible()
     
     def _on_generation_finished(self, result: str):
@@ -88,9 +88,28 @@ class TemplateEditor(QDialog):
     
     def __init__(self, template: Optional[Template] = None, parent=None, last_folder: str = ""):
         super().__init__(parent)
+        self.template: Optional[Template] = None
+        self.variables: list[Variable] = []
+        self.refinements: list[str] = []
+        self._last_folder = ""
+        self._initial_folder = ""
+        
+        self.setMinimumSize(600, 500)
+        self._setup_ui()
+        self.load(template, last_folder)
+    
+    def load(self, template: Optional[Template] = None, last_folder: str = ""):
+        """Reset the editor to edit a template, or to create a new one.
+        
+        Lets one editor instance be reused across openings.
+        
+        Args:
+            template: Template to edit, or None for a new template.
+            last_folder: Folder to preselect for a new template.
+        """
         self.template = template
-        self.variables: list[Variable] = list(template.variables) if template else []
-        self.refinements: list[str] = list(template.refinements) if template else []
+        self.variables = list(template.variables) if template else []
+        self.refinements = list(template.refinements) if template else []
         self._last_folder = last_folder
         
         # Get initial folder for existing templates
@@ -100,11 +119,19 @@ class TemplateEditor(QDialog):
             self._initial_folder = manager.get_template_folder(template)
         
         self.setWindowTitle("Edit Template" if template else "New Template")
-        self.setMinimumSize(600, 500)
-        self._setup_ui()
+        self._populate_folders()
         
         if template:
             self._load_template(template)
+        else:
+            self.name_edit.clear()
+            self.description_edit.clear()
+            self.trigger_edit.clear()
+            self.content_edit.clear()
+            self._refresh_var_list()
+            self._refresh_refinements_list()
+            self._update_refinements_visibility()
+        self.name_edit.setFocus()
     
     def _setup_ui(self):
         layout = QVBoxLayout(self)
@@ -126,7 +153,6 @@ class TemplateEditor(QDialog):
         
         # Folder selection
         self.folder_combo = QComboBox()
-        self._populate_folders()
         form.addRow("Folder:", self.folder_combo)
         
         layout.addLayout(form)
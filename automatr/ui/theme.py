@@ -1,5 +1,8 @@
 """PyQt6 theme configuration for Automatr."""
 
+from functools import lru_cache
+
+
 # Dark theme stylesheet
 DARK_THEME = """
 QMainWindow, QWidget {
@@ -246,9 +249,13 @@ QMainWindow, QWidget {
 """
 
 
+@lru_cache(maxsize=64)
 def get_theme_stylesheet(theme: str = "dark", font_size: int = 13) -> str:
     """Get the stylesheet for the specified theme.
     
+    Results are cached per (theme, font_size); the output only depends
+    on the arguments.
+    
     Args:
         theme: Theme name ("dark" or "light").
         font_size: Base font size in points for text content.